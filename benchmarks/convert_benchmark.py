@@ -0,0 +1,47 @@
+import time
+from typing import Any
+
+from relationalize import Schema
+
+# This benchmark compares converting rows of a 300 column table, a tenth of them choice columns,
+# with the previous per-field type checks of `convert_object` and with a compiled converter.
+# It is intended to be run from the working directory of `benchmarks`.
+
+COLUMN_COUNT = 300
+ROW_COUNT = 20_000
+
+
+def row(index: int) -> dict[str, Any]:
+    record: dict[str, Any] = {}
+    for column in range(COLUMN_COUNT):
+        if column % 10 == 0:
+            # A choice column alternating between int and str values.
+            record[f"column_{column}"] = index if index % 2 else str(index)
+        elif column % 10 == 1:
+            record[f"column_{column}"] = None
+        else:
+            record[f"column_{column}"] = index * 1.5
+    return record
+
+
+rows = [row(index) for index in range(ROW_COUNT)]
+schema = Schema()
+for record in rows[:2]:
+    schema.read_object(record)
+
+
+def convert_previous(record: dict[str, Any]) -> dict[str, Any]:
+    if len(schema.schema) > len(record):
+        return schema._convert_object_object_iteration(record)
+    return schema._convert_object_schema_iteration(record)
+
+
+for label, convert in (
+    ("previous convert_object", convert_previous),
+    ("compiled converter", schema.compile_converter()),
+):
+    start_time = time.perf_counter()
+    for record in rows:
+        convert(record)
+    duration = time.perf_counter() - start_time
+    print(f"{label}: {round(ROW_COUNT / duration)} rows/s")
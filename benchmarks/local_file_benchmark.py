@@ -0,0 +1,51 @@
+import tempfile
+import time
+from typing import Any
+
+from relationalize import Relationalize
+from relationalize.utils import create_local_file
+
+# This benchmark compares the rows/sec written to the local file system by `create_local_file`:
+# line buffered with a `write` per row (the previous default), with a large buffer,
+# and with a large buffer plus write-behind, each combined with batched rows.
+# It is intended to be run from the working directory of `benchmarks`.
+
+ROW_COUNT = 200_000
+
+
+def document(index: int) -> dict[str, Any]:
+    return {
+        "id": index,
+        "name": f"user_{index}",
+        "contact": {"email": f"user_{index}@example.com", "phone": 5550000 + index},
+        "tags": ["a", "b", "c"],
+    }
+
+
+def run(batch_size: int, buffer_size: int, write_behind: bool = False) -> float:
+    with tempfile.TemporaryDirectory() as output_dir:
+        create_output = create_local_file(
+            output_dir, buffer_size=buffer_size, write_behind=write_behind
+        )
+        start_time = time.perf_counter()
+        with Relationalize("benchmark", create_output, batch_size=batch_size) as r:
+            r.relationalize(document(index) for index in range(ROW_COUNT))
+        return time.perf_counter() - start_time
+
+
+# Each document produces 1 row in `benchmark` and 3 rows in `benchmark_tags`.
+rows = ROW_COUNT * 4
+line_buffered_duration = run(batch_size=1, buffer_size=1)
+print(f"line buffered: {round(rows / line_buffered_duration)} rows/s")
+
+for label, batch_size, buffer_size, write_behind in (
+    ("line buffered, batched", 1000, 1, False),
+    ("1 MiB buffer", 1, 1024**2, False),
+    ("1 MiB buffer, batched", 1000, 1024**2, False),
+    ("1 MiB buffer, batched, write-behind", 1000, 1024**2, True),
+):
+    duration = run(batch_size, buffer_size, write_behind)
+    print(
+        f"{label}: {round(rows / duration)} rows/s "
+        f"({round(line_buffered_duration / duration, 2)}x)"
+    )
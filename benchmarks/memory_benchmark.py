@@ -0,0 +1,107 @@
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from relationalize import Relationalize
+from relationalize.memory_store import MemoryStore
+from relationalize.serializers import get_serializer
+from relationalize.utils import create_local_buffer
+
+# This benchmark compares the memory used per relationalized row by the available in memory sinks:
+# JSON lines in `create_local_buffer` StringIOs, the dicts yielded by `iter_rows`, and a `MemoryStore`.
+# It then compares relationalizing and converting every row, as `examples/memory_example.py` does,
+# through StringIOs (parsing each line back) and through a `MemoryStore`.
+# It is intended to be run from the working directory of `benchmarks`.
+
+OBJECT_COUNT = 50_000
+
+
+def document(index: int) -> dict[str, Any]:
+    return {
+        "id": index,
+        "name": f"user_{index}",
+        "active": index % 2 == 0,
+        "contact": {"email": f"user_{index}@example.com", "phone": 5550000 + index},
+        "scores": [{"course": index % 7, "score": index % 100 / 10}] * 3,
+    }
+
+
+def buffers() -> Any:
+    r = Relationalize("benchmark", create_local_buffer())
+    r.relationalize(document(index) for index in range(OBJECT_COUNT))
+    return r.outputs
+
+
+def dicts() -> Any:
+    r = Relationalize("benchmark")
+    return list(r.iter_rows(document(index) for index in range(OBJECT_COUNT)))
+
+
+def memory_store() -> Any:
+    r = Relationalize("benchmark")
+    store = MemoryStore()
+    store.add_rows(r.iter_rows(document(index) for index in range(OBJECT_COUNT)))
+    return store
+
+
+def convert_buffers() -> Any:
+    serializer = get_serializer()
+    r = Relationalize("benchmark", create_local_buffer(), infer_schemas=True)
+    r.relationalize(document(index) for index in range(OBJECT_COUNT))
+    converted = 0
+    for identifier, schema in r.schemas.items():
+        r.outputs[identifier].seek(0)
+        for line in r.outputs[identifier].readlines():
+            schema.convert_object(serializer.loads(line))
+            converted += 1
+    return converted
+
+
+def convert_memory_store() -> Any:
+    r = Relationalize("benchmark", infer_schemas=True)
+    store = MemoryStore()
+    store.add_rows(r.iter_rows(document(index) for index in range(OBJECT_COUNT)))
+    converted = 0
+    for identifier, schema in r.schemas.items():
+        for _ in store.convert_rows(identifier, schema):
+            converted += 1
+    return converted
+
+
+def measure(sink: Callable[[], Any]) -> tuple[int, int]:
+    """
+    Returns the memory retained by the sink's result and the peak memory while creating it, in bytes.
+    """
+    tracemalloc.start()
+    result = sink()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+# Each document produces 1 row in `benchmark` and 3 rows in `benchmark_scores`.
+rows = OBJECT_COUNT * 4
+for label, sink in (
+    ("StringIO JSON lines", buffers),
+    ("iter_rows dicts", dicts),
+    ("MemoryStore tuples", memory_store),
+):
+    retained, peak = measure(sink)
+    print(
+        f"{label}: {round(retained / rows)} bytes/row retained, "
+        f"{round(peak / rows)} bytes/row peak"
+    )
+
+for label, pipeline in (
+    ("StringIO relationalize + convert", convert_buffers),
+    ("MemoryStore relationalize + convert", convert_memory_store),
+):
+    start_time = time.perf_counter()
+    pipeline()
+    duration = time.perf_counter() - start_time
+    _, peak = measure(pipeline)
+    print(
+        f"{label}: {round(rows / duration)} rows/s, {round(peak / rows)} bytes/row peak"
+    )
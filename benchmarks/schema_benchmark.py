@@ -0,0 +1,142 @@
+import time
+from typing import Any
+
+from relationalize import Relationalize, Schema
+from relationalize.utils import create_local_buffer
+
+# This benchmark compares reading objects into a `Schema` and merging schemas, with column types
+# kept as bitmasks and with the previous string based type names.
+# It also compares reading a homogeneous collection, where every row has the same keys and value types,
+# with and without the memo of merged row shapes, and reading the rows as batches or as columns.
+# Finally it compares inferring the schema while relationalizing, from scratch and warm started with a previous schema.
+# It is intended to be run from the working directory of `benchmarks`.
+
+COLUMN_COUNT = 100
+ROW_COUNT = 20_000
+SCHEMA_COUNT = 2_000
+
+
+def row(index: int) -> dict[str, Any]:
+    record: dict[str, Any] = {}
+    for column in range(COLUMN_COUNT):
+        if column % 4 == 0:
+            # A choice column cycling through three types.
+            record[f"column_{column}"] = (index, str(index), index * 1.5)[index % 3]
+        elif column % 4 == 1:
+            record[f"column_{column}"] = None if index % 2 else index
+        else:
+            record[f"column_{column}"] = f"value_{index}"
+    return record
+
+
+rows = [row(index) for index in range(ROW_COUNT)]
+
+
+def read_previous():
+    schema = Schema()
+    for record in rows:
+        for key, value in record.items():
+            schema._read_write_type_name(key, Schema._parse_type(value))
+    return schema
+
+
+def read_masks():
+    schema = Schema(shape_memo_size=0)
+    for record in rows:
+        schema.read_object(record)
+    return schema
+
+
+for label, read in (("previous read_object", read_previous), ("bitmasks", read_masks)):
+    start_time = time.perf_counter()
+    read()
+    duration = time.perf_counter() - start_time
+    print(f"{label}: {round(ROW_COUNT / duration)} rows/s")
+
+schemas = []
+for index in range(SCHEMA_COUNT):
+    schema = Schema()
+    schema.read_object(rows[index])
+    schemas.append(schema.schema)
+
+
+def merge_previous():
+    merged_schema: dict[str, Any] = {}
+    for schema in schemas:
+        for key, value_type in schema.items():
+            if key not in merged_schema:
+                merged_schema[key] = value_type
+            elif value_type != merged_schema[key]:
+                merged_schema[key] = Schema._merge_type_names(
+                    merged_schema[key], value_type
+                )
+    return merged_schema
+
+
+for label, merge in (
+    ("previous merge", merge_previous),
+    ("bitmask merge", lambda: Schema.merge(*schemas)),
+):
+    start_time = time.perf_counter()
+    merge()
+    duration = time.perf_counter() - start_time
+    print(f"{label}: {round(SCHEMA_COUNT / duration)} schemas/s")
+
+homogeneous_rows = [
+    {
+        "id": index,
+        "name": f"user_{index}",
+        "active": index % 2 == 0,
+        "score": index * 1.5,
+        **{f"column_{column}": f"value_{index}" for column in range(COLUMN_COUNT)},
+    }
+    for index in range(ROW_COUNT)
+]
+for label, shape_memo_size in (
+    ("homogeneous, no memo", 0),
+    ("homogeneous, memo", 1024),
+):
+    schema = Schema(shape_memo_size=shape_memo_size)
+    start_time = time.perf_counter()
+    for record in homogeneous_rows:
+        schema.read_object(record)
+    duration = time.perf_counter() - start_time
+    print(f"{label}: {round(ROW_COUNT / duration)} rows/s")
+
+
+def read_batches():
+    schema = Schema()
+    for start in range(0, ROW_COUNT, 1000):
+        schema.read_batch(rows[start : start + 1000])
+    return schema
+
+
+columns = {key: [record[key] for record in rows] for key in rows[0]}
+
+for label, read in (
+    ("read_batch", read_batches),
+    ("read_columns", lambda: Schema().read_columns(columns)),
+):
+    start_time = time.perf_counter()
+    read()
+    duration = time.perf_counter() - start_time
+    print(f"{label}: {round(ROW_COUNT / duration)} rows/s")
+
+
+def relationalize_rows(schemas: dict[str, Schema] | None):
+    with Relationalize(
+        "benchmark", create_local_buffer(), infer_schemas=True, schemas=schemas
+    ) as r:
+        r.relationalize(homogeneous_rows)
+    return r.schemas
+
+
+previous_schemas = relationalize_rows(None)
+for label, schemas in (
+    ("relationalize, infer_schemas", None),
+    ("relationalize, warm started", previous_schemas),
+):
+    start_time = time.perf_counter()
+    relationalize_rows(schemas)
+    duration = time.perf_counter() - start_time
+    print(f"{label}: {round(ROW_COUNT / duration)} rows/s")
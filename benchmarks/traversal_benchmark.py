@@ -0,0 +1,90 @@
+import time
+from typing import Any
+
+from relationalize import Relationalize, Schema
+from relationalize.relationalize import _DELIMITER
+from relationalize.utils import create_local_buffer
+
+# This benchmark compares the explicit-stack traversal of `Relationalize._relationalize`
+# against the previous recursive implementation on deep and wide documents,
+# as well as against flattening plans cached by document structure (`plan_cache_size`).
+# It is intended to be run from the working directory of `benchmarks`.
+
+ITERATIONS = 2_000
+DEPTH = 40
+WIDTH = 500
+
+
+class RecursiveRelationalize(Relationalize):
+    """
+    The recursive traversal `Relationalize._relationalize` used before the explicit-stack rewrite.
+    """
+
+    def _relationalize(
+        self,
+        d: Any,
+        path: str = "",
+        schema: Schema | None = None,
+        rows: list[tuple[str, dict[str, Any]]] | None = None,
+    ):
+        path_prefix = f"{path}{_DELIMITER}"
+        if path == "":
+            path_prefix = ""
+        if isinstance(d, list):
+            d = self._relationalize_list(d, path, rows=rows)
+
+        if isinstance(d, dict):
+            temp_d: dict[str, object] = {}
+            for key in d:
+                temp_d.update(
+                    self._relationalize(
+                        d[key], path=f"{path_prefix}{key}", schema=schema, rows=rows
+                    )
+                )
+            return temp_d
+
+        if schema is not None:
+            schema._read_write_object_key(path, d)
+        return {path: d}
+
+
+def deep_document(depth: int) -> dict[str, Any]:
+    document: dict[str, Any] = {"value": 1, "label": "leaf"}
+    for level in range(depth):
+        document = {"level": level, "name": f"level_{level}", "child": document}
+    return document
+
+
+def wide_document(width: int) -> dict[str, Any]:
+    return {
+        f"field_{index}": {"a": index, "b": str(index), "c": index / 2}
+        for index in range(width)
+    }
+
+
+def run(
+    cls: type[Relationalize],
+    document: dict[str, Any],
+    iterations: int,
+    plan_cache_size: int = 0,
+) -> float:
+    with cls("benchmark", create_local_buffer(), plan_cache_size=plan_cache_size) as r:
+        start_time = time.perf_counter()
+        r.relationalize(document for _ in range(iterations))
+        return time.perf_counter() - start_time
+
+
+for label, document in (
+    (f"deep ({DEPTH} levels)", deep_document(DEPTH)),
+    (f"wide ({WIDTH} objects)", wide_document(WIDTH)),
+):
+    recursive_duration = run(RecursiveRelationalize, document, ITERATIONS)
+    iterative_duration = run(Relationalize, document, ITERATIONS)
+    planned_duration = run(Relationalize, document, ITERATIONS, plan_cache_size=128)
+    print(
+        f"{label}: recursive {round(ITERATIONS / recursive_duration)} rows/s | "
+        f"iterative {round(ITERATIONS / iterative_duration)} rows/s "
+        f"({round(recursive_duration / iterative_duration, 2)}x) | "
+        f"planned {round(ITERATIONS / planned_duration)} rows/s "
+        f"({round(recursive_duration / planned_duration, 2)}x)"
+    )
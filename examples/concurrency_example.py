@@ -1,14 +1,15 @@
-import json
 import os
 import time
 from typing import Dict
 
 from relationalize import Relationalize, Schema
+from relationalize.serializers import get_serializer
 
 # This example shows how concurrency in the "relationalize" and "convert_object"
 # steps can be added.
 # This doesn't actually add any concurrency but shows what it could look like,
 # given a method of running concurrent workflows. EX: airflow.
+# To run the relationalize step across the cores of a single machine see `parallel_example.py`.
 
 # The general idea is:
 # [r] [r] [r] [r]...
@@ -28,11 +29,13 @@ FINAL_OUTPUT_DIR = "output/final"
 INPUT_DIR = "example_data/sharded_mock_lms"
 OBJECT_NAME = "users"
 
+serializer = get_serializer()
+
 
 def create_iterator(filename):
     with open(filename, "r") as infile:
         for line in infile:
-            yield json.loads(line)
+            yield serializer.loads(line)
 
 
 def get_objects_from_dir(directory: str):
@@ -87,7 +90,7 @@ for f in os.scandir(TEMP_OUTPUT_DIR):
     sharded_schemas = []
     for file in os.listdir(os.path.join(TEMP_OUTPUT_DIR, schema, "schemas")):
         sharded_schemas.append(
-            json.loads(
+            serializer.loads(
                 open(os.path.join(TEMP_OUTPUT_DIR, schema, "schemas", file), "r").read()
             )
         )
@@ -104,7 +107,7 @@ def convert_task(file: str, schema_name: str, schema: Schema):
         for object in create_iterator(
             os.path.join(TEMP_OUTPUT_DIR, schema_name, "files", file)
         ):
-            out_file.write(f"{json.dumps(schema.convert_object(object))}\n")
+            out_file.write(f"{serializer.dumps(schema.convert_object(object))}\n")
     print(f"Converted {file} for schema {schema_name}.")
 
 
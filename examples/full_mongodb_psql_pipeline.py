@@ -9,6 +9,7 @@ import psycopg2
 import pymongo
 from relationalize import Relationalize, Schema
 from relationalize.utils import create_local_file
+from relationalize.serializers import get_serializer
 
 # This example shows an entire pipeline built that moves data from a MongoDB collection into a postgres DB.
 # External Dependencies:
@@ -48,6 +49,7 @@ os.makedirs(LOCAL_TEMP_LOCATION, exist_ok=True)
 os.makedirs(LOCAL_FINAL_LOCATION, exist_ok=True)
 
 schemas: Dict[str, Schema] = {}
+serializer = get_serializer()
 
 
 def on_object_write(schema: str, object: dict):
@@ -59,7 +61,7 @@ def on_object_write(schema: str, object: dict):
 def create_iterator(filename):
     with open(filename, "r") as infile:
         for line in infile:
-            yield json.loads(line)
+            yield serializer.loads(line)
 
 
 ### EXPORT DATA FROM MongoDB ###
@@ -9,6 +9,7 @@ import psycopg2
 import requests
 from relationalize import Relationalize, Schema
 from relationalize.utils import create_local_file
+from relationalize.serializers import get_serializer
 
 # This example shows an entire pipeline built utilizing the pokeAPI, the local file system, and a PostgreSQL server.
 # External Dependencies:
@@ -43,6 +44,7 @@ os.makedirs(LOCAL_TEMP_LOCATION, exist_ok=True)
 os.makedirs(LOCAL_FINAL_LOCATION, exist_ok=True)
 
 schemas: Dict[str, Schema] = {}
+serializer = get_serializer()
 
 
 def on_object_write(schema: str, object: dict):
@@ -54,7 +56,7 @@ def on_object_write(schema: str, object: dict):
 def create_iterator(filename):
     with open(filename, "r") as infile:
         for line in infile:
-            yield json.loads(line)
+            yield serializer.loads(line)
 
 
 ### EXPORT DATA FROM API ###
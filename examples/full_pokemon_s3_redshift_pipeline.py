@@ -7,16 +7,15 @@ from uuid import uuid4
 import boto3
 import redshift_connector
 import requests
-import simplejson
 import smart_open
 
 from relationalize import Relationalize, Schema
+from relationalize.serializers import get_serializer
 
 # This example shows an entire pipeline built utilizing the pokeAPI, s3, and redshift.
 # External Dependencies:
 # smart_open==6.2.0
 # redshift-connector==2.0.909
-# simplejson==3.18.0
 # requests==2.28.1
 #
 # This example assumes that it provided with AWS credentials.
@@ -63,6 +62,8 @@ s3_final_location = f"{s3_temp_location}final/"
 s3_export_file_path = f"{S3_EXPORT_PATH}{OBJECT_NAME}.json"
 
 schemas: Dict[str, Schema] = {}
+# Redshift does not accept NaN within JSON, so NaN and Infinity are written as null.
+serializer = get_serializer(ignore_nan=True)
 
 
 # reducing the min_part_size from the default 50mb to 5mb (minimum allowed) reduces the memory usage.
@@ -85,7 +86,7 @@ def on_object_write(schema: str, object: dict):
 def create_s3_file_iterator(filename: str) -> Generator[Dict[str, Any], None, None]:
     with wopen(filename, "r") as infile:
         for line in infile:
-            yield json.loads(line)
+            yield serializer.loads(line)
 
 
 def create_relationalize_s3_file(identifier: str):
@@ -115,7 +116,12 @@ print("-" * 20)
 print(
     f"Relationalizing {OBJECT_NAME} from remote file: {S3_BUCKET}/{s3_export_file_path}"
 )
-with Relationalize(OBJECT_NAME, create_relationalize_s3_file, on_object_write) as r:
+with Relationalize(
+    OBJECT_NAME,
+    create_relationalize_s3_file,
+    on_object_write,
+    serializer=serializer,
+) as r:
     r.relationalize(create_s3_file_iterator(f"s3://{S3_BUCKET}/{s3_export_file_path}"))
 relationalize_checkpoint = time.time()
 
@@ -140,7 +146,7 @@ for schema_name, schema in schemas.items():
             f"s3://{s3_temp_location}intermediate/{schema_name}.json"
         ):
             final_file.write(
-                f"{simplejson.dumps(schema.convert_object(row), ignore_nan=True)}\n"
+                f"{serializer.dumps(schema.convert_object(row))}\n"
             )
     conversion_durations[schema_name] = time.time() - conversion_start_time
 conversion_checkpoint = time.time()
@@ -1,9 +1,9 @@
-import json
 import os
 from typing import Dict
 
 from relationalize import Relationalize, Schema
 from relationalize.utils import create_local_file
+from relationalize.serializers import get_serializer
 
 # This example utilizes the local file system as a temporary storage location.
 
@@ -14,11 +14,13 @@ INPUT_DIR = "example_data"
 INPUT_FILENAME = "mock_lms_data.json"
 OBJECT_NAME = "users"
 
+serializer = get_serializer()
+
 
 def create_iterator(filename):
     with open(filename, "r") as infile:
         for line in infile:
-            yield json.loads(line)
+            yield serializer.loads(line)
 
 
 def get_objects_from_dir(directory: str):
@@ -48,11 +50,11 @@ for filename in get_objects_from_dir(TEMP_OUTPUT_DIR):
 for filename in get_objects_from_dir(TEMP_OUTPUT_DIR):
     object_name, _ = os.path.splitext(filename)
 
-    with open(os.path.join(FINAL_OUTPUT_DIR, filename), "w") as out_file:
-        for obj in create_iterator(os.path.join(TEMP_OUTPUT_DIR, filename)):
-            converted_obj = schemas[object_name].convert_object(obj)
-            serialized_row = json.dumps(converted_obj)
-            out_file.write(f"{serialized_row}\n")
+    schemas[object_name].convert_file(
+        os.path.join(TEMP_OUTPUT_DIR, filename),
+        os.path.join(FINAL_OUTPUT_DIR, filename),
+        serializer=serializer,
+    )
 
     with open(
         os.path.join(FINAL_OUTPUT_DIR, f"DDL_{object_name}.sql"), "w"
@@ -0,0 +1,60 @@
+import os
+import time
+
+from relationalize import Schema, parallel_relationalize
+from relationalize.rids import integer_rids
+from relationalize.serializers import get_serializer
+
+# This example relationalizes sharded input across a pool of worker processes.
+# Each worker relationalizes a shard and generates the schemas of its outputs,
+# the per-shard schemas are then merged into one schema per output.
+# Integer RIDs are used, each worker getting its shard index as the RID shard,
+# which keeps them unique across all shards.
+
+TEMP_OUTPUT_DIR = "output/temp"
+FINAL_OUTPUT_DIR = "output/final"
+INPUT_DIR = "example_data/sharded_mock_lms"
+OBJECT_NAME = "users"
+WORKERS = os.cpu_count()
+
+serializer = get_serializer()
+
+
+def convert(schema: Schema, locations: list[str], output_path: str):
+    with open(output_path, "w") as out_file:
+        for location in locations:
+            with open(location, "r") as infile:
+                for line in infile:
+                    converted_obj = schema.convert_object(serializer.loads(line))
+                    out_file.write(f"{serializer.dumps(converted_obj)}\n")
+
+
+if __name__ == "__main__":
+    # 0. Set up file system
+    start_time = time.time()
+    os.makedirs(TEMP_OUTPUT_DIR, exist_ok=True)
+    os.makedirs(FINAL_OUTPUT_DIR, exist_ok=True)
+
+    # 1. Relationalize the shards and merge their schemas
+    schemas, output_locations = parallel_relationalize(
+        [os.path.join(INPUT_DIR, file) for file in sorted(os.listdir(INPUT_DIR))],
+        OBJECT_NAME,
+        output_dir=TEMP_OUTPUT_DIR,
+        workers=WORKERS,
+        rid_generator_factory=integer_rids,
+    )
+    print(f"Done relationalizing. Found {len(schemas)} schemas accross all shards.")
+
+    # 2. Convert transform/flattened data to prep for database and generate SQL DDL
+    for schema_name, schema in schemas.items():
+        convert(
+            schema,
+            output_locations[schema_name],
+            os.path.join(FINAL_OUTPUT_DIR, f"{schema_name}.json"),
+        )
+        with open(
+            os.path.join(FINAL_OUTPUT_DIR, f"DDL_{schema_name}.sql"), "w"
+        ) as ddl_file:
+            ddl_file.write(schema.generate_ddl(table=schema_name, schema="public"))
+
+    print(f"Complete. Total Duration: {round(time.time()- start_time, 2)} seconds.")
@@ -1,20 +1,18 @@
-import json
 import time
 from typing import Any, Dict, Generator
 from uuid import uuid4
 
 import boto3
 import redshift_connector
-import simplejson
 import smart_open
 
 from relationalize import Relationalize, Schema
+from relationalize.serializers import get_serializer
 
 # This example shows how data can be transformed/moved from a given location in s3, and moved into a redshift db.
 # External Dependencies:
 # smart_open==6.2.0
 # redshift-connector==2.0.909
-# simplejson==3.18.0
 #
 # This example assumes that it is provided with AWS credentials.
 # For more information please see: https://boto3.amazonaws.com/v1/documentation/api/latest/guide/credentials.html
@@ -52,6 +50,8 @@ s3_temp_location = (
 s3_final_location = f"{s3_temp_location}final/"
 
 schemas: Dict[str, Schema] = {}
+# Redshift does not accept NaN within JSON, so NaN and Infinity are written as null.
+serializer = get_serializer(ignore_nan=True)
 
 
 # reducing the min_part_size from the default 50mb to 5mb (minimum allowed) reduces the memory usage.
@@ -74,7 +74,7 @@ def on_object_write(schema: str, object: dict):
 def create_s3_file_iterator(filename: str) -> Generator[Dict[str, Any], None, None]:
     with wopen(filename, "r") as infile:
         for line in infile:
-            yield json.loads(line)
+            yield serializer.loads(line)
 
 
 def create_relationalize_s3_file(identifier: str):
@@ -87,7 +87,12 @@ def create_relationalize_s3_file(identifier: str):
 ### RELATIONALIZE ###
 print("-" * 20)
 print(f"Relationalizing {OBJECT_NAME} from remote file: {S3_BUCKET}/{S3_FILE_PATH}")
-with Relationalize(OBJECT_NAME, create_relationalize_s3_file, on_object_write) as r:
+with Relationalize(
+    OBJECT_NAME,
+    create_relationalize_s3_file,
+    on_object_write,
+    serializer=serializer,
+) as r:
     r.relationalize(create_s3_file_iterator(f"s3://{S3_BUCKET}/{S3_FILE_PATH}"))
 relationalize_checkpoint = time.time()
 
@@ -112,7 +117,7 @@ for schema_name, schema in schemas.items():
             f"s3://{s3_temp_location}intermediate/{schema_name}.json"
         ):
             final_file.write(
-                f"{simplejson.dumps(schema.convert_object(row), ignore_nan=True)}\n"
+                f"{serializer.dumps(schema.convert_object(row))}\n"
             )
     conversion_durations[schema_name] = time.time() - conversion_start_time
 conversion_checkpoint = time.time()
@@ -1,2 +1,6 @@
 from .relationalize import Relationalize as Relationalize
+from .async_relationalize import AsyncRelationalize as AsyncRelationalize
 from .schema import Schema as Schema
+from .schema import SchemaMismatchError as SchemaMismatchError
+from .parallel import parallel_relationalize as parallel_relationalize
+from .parallel import merge_schemas as merge_schemas
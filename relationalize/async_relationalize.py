@@ -0,0 +1,158 @@
+import asyncio
+from collections.abc import AsyncIterable, Awaitable, Iterable
+from inspect import isawaitable
+from types import TracebackType
+from typing import Any, Callable, Protocol
+
+from .relationalize import Relationalize
+from .utils import no_op
+
+DEFAULT_MAX_PENDING_WRITES = 64
+
+
+class AsyncWritable(Protocol):
+    """
+    An output accepted by `AsyncRelationalize`, EX: an aiofiles file object.
+    """
+
+    async def write(self, s: str) -> Any:
+        ...
+
+    async def close(self) -> Any:
+        ...
+
+
+class AsyncRelationalize(Relationalize):
+    """
+    An asyncio variant of `Relationalize`, producing the same output.
+    ```
+    async with AsyncRelationalize('abc', create_output) as r:
+        await r.relationalize(async_iterable_of_objects)
+    ```
+
+    `create_output` is an async factory of `AsyncWritable` outputs.
+    Traversal stays synchronous, the batches it produces are written by tasks which overlap with traversal
+    and with each other, while the writes to a single output keep their order.
+    At most `max_pending_writes` batches are in flight, after that traversal waits.
+    Any other keyword arguments are passed to `Relationalize`, except for `io_workers` and `max_open_outputs`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        create_output: Callable[[str], Awaitable[AsyncWritable]],
+        on_object_write: Callable[[str, dict[str, Any]], None] = no_op,
+        max_pending_writes: int = DEFAULT_MAX_PENDING_WRITES,
+        **kwargs: Any,
+    ):
+        if kwargs.get("io_workers"):
+            raise ValueError("AsyncRelationalize does not support io_workers.")
+        if kwargs.get("max_open_outputs"):
+            raise ValueError("AsyncRelationalize does not support max_open_outputs.")
+        super().__init__(name, create_output, on_object_write, **kwargs)
+        self.max_pending_writes = max_pending_writes
+        self.outputs: dict[str, AsyncWritable] = {}
+        self._last_writes: dict[str, asyncio.Future[None]] = {}
+        self._pending_writes: set[asyncio.Future[None]] = set()
+
+    def __enter__(self):
+        # The inherited `__exit__` would create the `close_io` coroutine without awaiting it.
+        raise TypeError("Use AsyncRelationalize with `async with` instead of `with`.")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(
+        self,
+        _type: type[BaseException] | None,
+        _value: BaseException | None,
+        _traceback: TracebackType | None,
+    ) -> None:
+        await self.close_io()
+
+    async def relationalize(
+        self,
+        object_list: AsyncIterable[dict[str, object]] | Iterable[dict[str, object]],
+    ):
+        """
+        Main entrypoint into this class.
+
+        Pass in an AsyncIterable (or Iterable) and it will relationalize it,
+        outputing to wherever was designated when instantiating the class.
+        """
+        if isinstance(object_list, AsyncIterable):
+            async for item in object_list:
+                await self._relationalize_item(item)
+        else:
+            for item in object_list:
+                await self._relationalize_item(item)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Writes the pending batches of all outputs and waits for all writes.
+        """
+        super().flush()
+        await self._wait_for_writes()
+
+    async def close_io(self) -> None:
+        try:
+            await self.flush()
+        finally:
+            for output in self.outputs.values():
+                await _maybe_await(output.close())
+
+    async def _relationalize_item(self, item: dict[str, object]):
+        pending_write_count = len(self._pending_writes)
+        schema = self._get_schema(self.name)
+        self._write_to_output(self.name, self._relationalize(item, schema=schema))
+        if len(self._pending_writes) == pending_write_count:
+            return
+        # Let the new writes start while traversal continues.
+        await asyncio.sleep(0)
+        while len(self._pending_writes) > self.max_pending_writes:
+            await asyncio.wait(
+                self._pending_writes, return_when=asyncio.FIRST_COMPLETED
+            )
+
+    def _open_output(self, identifier: str):
+        # The output is created by the first write to it.
+        self._batches[identifier] = []
+        self._batch_sizes[identifier] = 0
+
+    def _write_batch(self, key: str, content: str):
+        write = asyncio.ensure_future(
+            self._write_after(key, content, self._last_writes.get(key))
+        )
+        self._last_writes[key] = write
+        self._pending_writes.add(write)
+        write.add_done_callback(self._pending_writes.discard)
+
+    async def _write_after(
+        self, key: str, content: str, previous_write: asyncio.Future[None] | None
+    ):
+        """
+        Writes to the given output once the previous write to it is done.
+        """
+        if previous_write is not None:
+            await previous_write
+        if key not in self.outputs:
+            self.outputs[key] = await self.create_output(key)
+        await _maybe_await(self.outputs[key].write(content))
+
+    async def _wait_for_writes(self):
+        """
+        Waits for all writes, raising the first error encountered.
+        """
+        results = await asyncio.gather(
+            *self._last_writes.values(), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+
+async def _maybe_await(result: Any) -> Any:
+    if isawaitable(result):
+        return await result
+    return result
@@ -0,0 +1,85 @@
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from .schema import Schema
+
+# Marks a column which is absent from a row, as opposed to a column holding `None`.
+_MISSING = object()
+
+
+class MemoryStore:
+    """
+    An in memory sink keeping relationalized rows as tuples, per table.
+    ```
+    store = MemoryStore()
+    r = Relationalize('abc', infer_schemas=True)
+    store.add_rows(r.iter_rows(objects))
+    for row in store.convert_rows('abc', r.schemas['abc']):
+        ...
+    ```
+
+    Every table has a fixed column order, extended whenever a row introduces a new column.
+    Rows are stored as tuples of their values in that order, without keys and without serialization.
+    That takes a fraction of the memory of dicts, though somewhat more than JSON lines buffered in a StringIO.
+    """
+
+    def __init__(self):
+        self.columns: dict[str, list[str]] = {}
+        self.rows: dict[str, list[tuple[Any, ...]]] = {}
+        self._column_keys: dict[str, tuple[str, ...]] = {}
+
+    def add_rows(self, rows: Iterable[tuple[str, dict[str, Any]]]):
+        """
+        Adds `(identifier, row)` tuples, as yielded by `Relationalize.iter_rows`.
+        """
+        for identifier, row in rows:
+            self.add_row(identifier, row)
+
+    def add_row(self, identifier: str, row: dict[str, Any]):
+        """
+        Adds a single row to the table of the given identifier.
+        """
+        if identifier not in self.rows:
+            self.columns[identifier] = list(row)
+            self.rows[identifier] = []
+            self._column_keys[identifier] = tuple(row)
+        column_keys = self._column_keys[identifier]
+        if len(row) == len(column_keys) and all(map(str.__eq__, row, column_keys)):
+            # The row has the table's columns, in order.
+            self.rows[identifier].append(tuple(row.values()))
+            return
+
+        columns = self.columns[identifier]
+        for key in row:
+            if key not in column_keys:
+                columns.append(key)
+        if len(columns) != len(column_keys):
+            self._column_keys[identifier] = column_keys = tuple(columns)
+        self.rows[identifier].append(
+            tuple(row.get(column, _MISSING) for column in column_keys)
+        )
+
+    def iter_rows(self, identifier: str) -> Iterator[dict[str, Any]]:
+        """
+        Yields the rows of the given table as dicts, equal to the rows that were added.
+        """
+        columns = self.columns.get(identifier, [])
+        for values in self.rows.get(identifier, []):
+            yield {
+                column: value
+                for column, value in zip(columns, values)
+                if value is not _MISSING
+            }
+
+    def convert_rows(self, identifier: str, schema: Schema) -> Iterator[dict[str, Any]]:
+        """
+        Yields the rows of the given table converted by `schema.convert_object`.
+        """
+        for row in self.iter_rows(identifier):
+            yield schema.convert_object(row)
+
+    def row_count(self, identifier: str) -> int:
+        """
+        Returns the number of rows in the table of the given identifier.
+        """
+        return len(self.rows.get(identifier, []))
@@ -0,0 +1,236 @@
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
+from typing import Any, Callable, NamedTuple
+
+from .relationalize import Relationalize
+from .rids import RIDGenerator
+from .schema import Schema
+from .serializers import DEFAULT_SERIALIZER
+from .types import ColumnType
+from .utils import DEFAULT_FILE_BUFFER_SIZE
+
+DEFAULT_MERGE_CHUNK_SIZE = 256
+
+
+class ByteRange(NamedTuple):
+    """
+    A newline aligned `[start, end)` byte range of a newline delimited JSON file.
+    """
+
+    path: str
+    start: int
+    end: int
+
+
+def split_ndjson(path: str, parts: int) -> list[ByteRange]:
+    """
+    Splits a newline delimited JSON file into (at most) `parts` byte ranges of similar size.
+
+    Every range starts at the beginning of a line and ends after a newline (or at the end of the file),
+    so each one can be relationalized by a separate worker, EX: `parallel_relationalize(split_ndjson(path, 64), ...)`.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    boundaries = [0]
+    with open(path, "rb") as infile:
+        for part in range(1, parts):
+            offset = max(size * part // parts, boundaries[-1])
+            if offset > 0:
+                # Move to the start of the next line, unless the offset already is one.
+                infile.seek(offset - 1)
+                infile.readline()
+                offset = infile.tell()
+            if offset >= size:
+                break
+            if offset > boundaries[-1]:
+                boundaries.append(offset)
+    boundaries.append(size)
+    return [
+        ByteRange(path, start, end) for start, end in zip(boundaries, boundaries[1:])
+    ]
+
+
+def read_ndjson_range(
+    byte_range: ByteRange, use_mmap: bool = True
+) -> Iterator[dict[str, Any]]:
+    """
+    Reads the objects within a byte range of a newline delimited JSON file.
+
+    With `use_mmap` the file is memory-mapped, so workers share the page cache instead of copying the file.
+    """
+    path, start, end = byte_range
+    with open(path, "rb") as infile:
+        if not use_mmap:
+            infile.seek(start)
+            while infile.tell() < end:
+                line = infile.readline()
+                if line.strip():
+                    yield DEFAULT_SERIALIZER.loads(line)
+            return
+
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            position = start
+            while position < end:
+                line_end = mapped_file.find(b"\n", position, end)
+                if line_end == -1:
+                    line_end = end
+                line = mapped_file[position:line_end]
+                if line.strip():
+                    yield DEFAULT_SERIALIZER.loads(line)
+                position = line_end + 1
+
+
+def read_ndjson(shard: str | ByteRange) -> Iterator[dict[str, Any]]:
+    """
+    Reads the objects of a newline delimited JSON file, or of a byte range within one.
+    """
+    if isinstance(shard, ByteRange):
+        yield from read_ndjson_range(shard)
+        return
+    with open(shard, "rb") as infile:
+        for line in infile:
+            if line.strip():
+                yield DEFAULT_SERIALIZER.loads(line)
+
+
+def parallel_relationalize(
+    inputs: Iterable[Any],
+    name: str,
+    output_dir: str = "",
+    workers: int | None = None,
+    read_input: Callable[[Any], Iterable[dict[str, Any]]] = read_ndjson,
+    rid_generator_factory: Callable[[int], RIDGenerator] | None = None,
+    **relationalize_kwargs: Any,
+) -> tuple[dict[str, Schema], dict[str, list[str]]]:
+    """
+    Relationalizes input shards across a pool of `workers` processes, one shard per task.
+    By default shards are newline delimited JSON files or `ByteRange`s created by `split_ndjson`.
+
+    Each worker reads its shard with `read_input`, relationalizes it into
+    `{output_dir}/{identifier}/part-{shard index}.json` and generates the schemas of its outputs.
+    The per-shard schemas are merged with `Schema.merge`.
+
+    `rid_generator_factory` is called with the shard index to create each worker's `rid_generator`,
+    EX: `relationalize.rids.integer_rids`. Random uuid4 IDs are used by default.
+    Any other keyword arguments are passed to `Relationalize`.
+    `read_input`, `rid_generator_factory` and the keyword arguments must be picklable.
+
+    Returns the merged schemas and the output files, both by identifier.
+    """
+    tasks = [
+        (
+            shard_index,
+            shard,
+            name,
+            output_dir,
+            read_input,
+            rid_generator_factory,
+            relationalize_kwargs,
+        )
+        for shard_index, shard in enumerate(inputs)
+    ]
+    if workers == 1:
+        results = list(map(_relationalize_shard, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_relationalize_shard, tasks))
+
+    sharded_schemas: dict[str, list[dict[str, ColumnType]]] = {}
+    output_locations: dict[str, list[str]] = {}
+    for shard_schemas, shard_outputs in results:
+        for identifier, schema in shard_schemas.items():
+            sharded_schemas.setdefault(identifier, []).append(schema)
+        for identifier, location in shard_outputs.items():
+            output_locations.setdefault(identifier, []).append(location)
+
+    schemas = {
+        identifier: Schema.merge(*shard_schemas)
+        for identifier, shard_schemas in sharded_schemas.items()
+    }
+    return schemas, output_locations
+
+
+def _relationalize_shard(
+    task: tuple[
+        int,
+        Any,
+        str,
+        str,
+        Callable[[Any], Iterable[dict[str, Any]]],
+        Callable[[int], RIDGenerator] | None,
+        dict[str, Any],
+    ]
+) -> tuple[dict[str, dict[str, ColumnType]], dict[str, str]]:
+    """
+    Relationalizes a single input shard. Runs within a worker process.
+    """
+    (
+        shard_index,
+        shard,
+        name,
+        output_dir,
+        read_input,
+        rid_generator_factory,
+        relationalize_kwargs,
+    ) = task
+    output_locations: dict[str, str] = {}
+
+    def create_shard_file(identifier: str):
+        os.makedirs(os.path.join(output_dir, identifier), exist_ok=True)
+        location = os.path.join(output_dir, identifier, f"part-{shard_index:05d}.json")
+        output_locations[identifier] = location
+        return open(location, "w", buffering=DEFAULT_FILE_BUFFER_SIZE, encoding="utf-8")
+
+    # The merged schemas are built from the inferred ones, whatever the caller passed.
+    relationalize_kwargs = {**relationalize_kwargs, "infer_schemas": True}
+    if rid_generator_factory is not None:
+        relationalize_kwargs["rid_generator"] = rid_generator_factory(shard_index)
+    with Relationalize(name, create_shard_file, **relationalize_kwargs) as r:
+        r.relationalize(read_input(shard))
+
+    return (
+        {identifier: schema.schema for identifier, schema in r.schemas.items()},
+        output_locations,
+    )
+
+
+def merge_schemas(
+    schemas: Sequence[Schema | dict[str, ColumnType]],
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_MERGE_CHUNK_SIZE,
+) -> Schema:
+    """
+    Merges many schemas into one, like `Schema.merge`, as a tree reduction across a pool of `workers` processes.
+
+    Each task merges `chunk_size` consecutive schemas, which are shipped in the binary encoding of `Schema.to_bytes`.
+    Rounds continue on the merged chunks until at most `chunk_size` remain, which are merged in this process.
+    Chunks are merged in order, so the columns keep the order `Schema.merge` gives them.
+    """
+    if chunk_size < 2:
+        raise ValueError("chunk_size must be at least 2.")
+    encoded_schemas = [
+        (schema if isinstance(schema, Schema) else Schema(schema)).to_bytes()
+        for schema in schemas
+    ]
+    if len(encoded_schemas) > chunk_size and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while len(encoded_schemas) > chunk_size:
+                chunks = [
+                    encoded_schemas[start : start + chunk_size]
+                    for start in range(0, len(encoded_schemas), chunk_size)
+                ]
+                encoded_schemas = list(executor.map(_merge_encoded_schemas, chunks))
+    return Schema.from_bytes(_merge_encoded_schemas(encoded_schemas))
+
+
+def _merge_encoded_schemas(encoded_schemas: list[bytes]) -> bytes:
+    """
+    Merges schemas encoded by `Schema.to_bytes`. Runs within a worker process for `merge_schemas`.
+    """
+    merged_schema: Schema = Schema()
+    for encoded_schema in encoded_schemas:
+        merged_schema.merge_in(Schema.from_bytes(encoded_schema))
+    return merged_schema.to_bytes()
@@ -1,19 +1,31 @@
-from collections.abc import Iterable
-import json
+from collections.abc import Iterable, Iterator, Mapping
+from functools import lru_cache
 from types import TracebackType
 from typing import Any, Callable, TextIO
-from uuid import uuid4
 
-from .utils import no_op, create_local_file
+from .rids import RIDGenerator, is_content_addressed, uuid_rids
+from .schema import Schema, SchemaDelta
+from .serializers import DEFAULT_SERIALIZER, Serializer
+from .types import ColumnType
+from .utils import DEFAULT_WRITER_POOL_QUEUE_SIZE, WriterPool, no_op, create_local_file
 
 _DELIMITER = "_"
-_ID_PREFIX = "R"
 _ID = f"{_DELIMITER}rid{_DELIMITER}"
 _VAL = f"{_DELIMITER}val{_DELIMITER}"
 _INDEX = f"{_DELIMITER}index{_DELIMITER}"
 
+# Structural fingerprint markers. A key is followed by `_OBJECT` when its value is a nested object
+# (closed by `_END`), by `_ARRAY` when its value is a list, and by nothing when it is a scalar.
+_OBJECT = object()
+_ARRAY = object()
+_END = object()
+
 
 DEFAULT_LOCAL_FILE_CALLABLE = create_local_file()
+DEFAULT_RID_GENERATOR = uuid_rids()
+DEFAULT_MAX_DEDUPLICATED_ARRAYS = 100_000
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_BATCH_BYTES = 1024**2
 
 class Relationalize:
     """
@@ -28,11 +40,99 @@ class Relationalize:
         name: str,
         create_output: Callable[[str], TextIO] = DEFAULT_LOCAL_FILE_CALLABLE,
         on_object_write: Callable[[str, dict[str, Any]], None] = no_op,
+        plan_cache_size: int = 0,
+        rid_generator: RIDGenerator = DEFAULT_RID_GENERATOR,
+        deduplicate_arrays: bool = False,
+        max_deduplicated_arrays: int = DEFAULT_MAX_DEDUPLICATED_ARRAYS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_bytes: int = DEFAULT_BATCH_BYTES,
+        serializer: Serializer = DEFAULT_SERIALIZER,
+        io_workers: int = 0,
+        io_queue_size: int = DEFAULT_WRITER_POOL_QUEUE_SIZE,
+        max_open_outputs: int | None = None,
+        reopen_output: Callable[[str], TextIO] | None = None,
+        infer_schemas: bool = False,
+        schemas: Mapping[str, Schema | dict[str, ColumnType]] | None = None,
     ):
+        """
+        `plan_cache_size` enables flattening plans, compiled once per document structure and kept in an
+        LRU cache of that size. Worthwhile when most documents share a few nested structures. 0 disables it.
+
+        `rid_generator` determines the relationalize IDs linking arrays to their parent rows.
+        See `relationalize.rids` for the available strategies, random uuid4 IDs by default.
+
+        `deduplicate_arrays` writes the rows of an array only the first time its relationalize ID is seen
+        for a sub-table. Requires content-addressed IDs (`relationalize.rids.content_hash_rids`).
+        The IDs of the `max_deduplicated_arrays` most recently seen arrays are kept, an array seen again
+        after it was evicted is written again.
+
+        Serialized rows are collected per output and written with a single `write` once an output
+        holds `batch_size` rows or `batch_bytes` characters. Every call to `relationalize` ends with a `flush`.
+
+        `serializer` encodes the rows, the fastest installed JSON backend by default.
+
+        `io_workers` hands the batches to a pool of writer threads, so traversal continues while
+        (network backed) outputs are written. Each thread queues at most `io_queue_size` batches,
+        after that traversal waits. `flush` and `close_io` wait for the pending writes and raise any write error.
+
+        `max_open_outputs` bounds the number of open outputs. Once it is reached, the least recently written
+        output is flushed and closed. Writing to it again opens it with `reopen_output`, which must append
+        to the existing output or start a new part of it, EX: `create_local_file(output_dir, append=True)`.
+
+        `infer_schemas` records the column types of every output in `schemas`, by identifier, while the rows
+        are being built. Equivalent to an `on_object_write` callback calling `Schema.read_object`, without the
+        callback and the second pass over each row.
+
+        `schemas` warm starts `infer_schemas`, which it enables, with the schemas of a previous run by identifier,
+        EX: loaded with `Schema.deserialize`. The rows of those outputs are validated as a whole instead: a row with
+        the columns and value types of a row seen before is a single lookup, and only rows which do not fit change the schema.
+        The changes are reported by `schema_delta`. The given schemas are copied, not modified.
+        """
+        if max_open_outputs is not None:
+            if max_open_outputs < 1:
+                raise ValueError("max_open_outputs must be at least 1.")
+            if reopen_output is None:
+                raise ValueError("max_open_outputs requires reopen_output.")
+        if deduplicate_arrays:
+            if not is_content_addressed(rid_generator):
+                raise ValueError(
+                    "deduplicate_arrays requires a content-addressed rid_generator."
+                )
+            if max_deduplicated_arrays < 1:
+                raise ValueError("max_deduplicated_arrays must be at least 1.")
         self.name = name
         self.create_output = create_output
         self.on_object_write = on_object_write
+        self.rid_generator = rid_generator
+        self.deduplicate_arrays = deduplicate_arrays
+        self.max_deduplicated_arrays = max_deduplicated_arrays
+        # Ordered from the least to the most recently seen.
+        self._written_rids: dict[tuple[str, str | int], None] = {}
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.serializer = serializer
         self.outputs: dict[str, TextIO] = {}
+        self._batches: dict[str, list[str]] = {}
+        self._batch_sizes: dict[str, int] = {}
+        self.max_open_outputs = max_open_outputs
+        self.reopen_output = reopen_output
+        self._closed_outputs: set[str] = set()
+        self.infer_schemas = infer_schemas or schemas is not None
+        self.schemas: dict[str, Schema] = {}
+        # The schemas `schemas` were warm started with, by identifier.
+        self._seed_schemas: dict[str, dict[str, ColumnType]] = {}
+        for identifier, schema in (schemas or {}).items():
+            seed = dict(schema.schema if isinstance(schema, Schema) else schema)
+            self._seed_schemas[identifier] = seed
+            self.schemas[identifier] = Schema(dict(seed))
+        self._writer_pool = (
+            WriterPool(io_workers, io_queue_size) if io_workers > 0 else None
+        )
+        self._compile_plan = (
+            lru_cache(maxsize=plan_cache_size)(self._build_plan)
+            if plan_cache_size > 0
+            else None
+        )
 
     def __enter__(self):
         return self
@@ -52,79 +152,358 @@ class Relationalize:
         Pass in an Iterable and it will relationalize it, outputing to wherever was designated when instantiating the class.
         """
         for item in object_list:
-            self._write_to_output(self.name, self._relationalize(item))
+            # Looked up per object, so the schema is only created once a row is written.
+            schema = self._get_schema(self.name)
+            self._write_to_output(self.name, self._relationalize(item, schema=schema))
+        self.flush()
+
+    def iter_rows(
+        self, object_list: Iterable[dict[str, object]]
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Relationalizes an Iterable lazily, yielding `(identifier, row)` tuples instead of writing to outputs.
+
+        The rows of each object are yielded before the next object is read, sub-table rows ahead of the row
+        referencing them. No outputs are created and nothing is serialized.
+        `on_object_write` and `infer_schemas` apply as they do for `relationalize`.
+        EX: `for identifier, row in r.iter_rows(objects): loaders[identifier].append(row)`
+        """
+        for item in object_list:
+            # Each call collects its own rows, so generators and `relationalize` can be interleaved.
+            rows: list[tuple[str, dict[str, Any]]] = []
+            schema = self._get_schema(self.name)
+            self._write_to_output(
+                self.name,
+                self._relationalize(item, schema=schema, rows=rows),
+                rows=rows,
+            )
+            yield from rows
+
+    def flush(self) -> None:
+        """
+        Writes the pending batches of all outputs.
+        """
+        for key in self._batches:
+            self._flush_batch(key)
+        if self._writer_pool is not None:
+            self._writer_pool.join()
+
+    def _flush_batch(self, key: str):
+        """
+        Writes the pending batch of the given output with a single `write`.
+        """
+        batch = self._batches[key]
+        if not batch:
+            return
+        batch.append("")
+        self._write_batch(key, "\n".join(batch))
+        batch.clear()
+        self._batch_sizes[key] = 0
+
+    def _write_batch(self, key: str, content: str):
+        """
+        Writes serialized rows to the given output, or hands them to the writer pool.
+        """
+        if self._writer_pool is None:
+            _ = self.outputs[key].write(content)
+            return
+        self._writer_pool.submit(key, self.outputs[key], content)
 
     def _write_row(self, key: str, row: dict[str, Any]):
         """
-        Writes a row to the given output.
+        Writes a row to the batch of the given output, flushing the batch once it is full.
         """
-        _ = self.outputs[key].write(json.dumps(row))
-        _ = self.outputs[key].write("\n")
+        serialized_row = self.serializer.dumps(row)
+        batch = self._batches[key]
+        batch.append(serialized_row)
+        batch_size = self._batch_sizes[key] + len(serialized_row) + 1
+        if len(batch) >= self.batch_size or batch_size >= self.batch_bytes:
+            self._flush_batch(key)
+        else:
+            self._batch_sizes[key] = batch_size
         self.on_object_write(key, row)
 
     def _write_to_output(
-        self, key: str, content: dict[str, Any] | list[dict[str, Any]], is_sub: bool = False
+        self,
+        key: str,
+        content: dict[str, Any] | list[dict[str, Any]],
+        is_sub: bool = False,
+        rows: list[tuple[str, dict[str, Any]]] | None = None,
     ):
         """
         Writes content, either a single object, or a list of objects to the output.
 
         Will create a new TextIO if needed.
+        Given `rows`, the `(identifier, row)` tuples are appended to it instead of written to the output.
         """
         identifier = f"{self.name}{_DELIMITER}{key}" if is_sub else key
-        if identifier not in self.outputs:
-            self.outputs[identifier] = self.create_output(identifier)
+        if identifier in self._seed_schemas:
+            schema = self.schemas[identifier]
+            for row in content if isinstance(content, list) else [content]:
+                schema.read_object(row)
+        if rows is not None:
+            # Rows are being yielded by `iter_rows`.
+            for row in content if isinstance(content, list) else [content]:
+                rows.append((identifier, row))
+                self.on_object_write(identifier, row)
+            return
+        if identifier not in self._batches:
+            self._open_output(identifier)
+        elif self.max_open_outputs is not None:
+            # Mark the output as the most recently used one.
+            self.outputs[identifier] = self.outputs.pop(identifier)
         if isinstance(content, list):
             for row in content:
                 self._write_row(identifier, row)
             return
         self._write_row(identifier, content)
 
-    def _list_helper(self, id: str, index: int, row: dict[str, object] | Any, path: str):
+    def _open_output(self, identifier: str):
+        """
+        Creates the output, and its batch, for the given identifier.
+
+        Reopens the output if it was closed by `max_open_outputs`, closing the least recently used one first.
+        """
+        if (
+            self.max_open_outputs is not None
+            and len(self.outputs) >= self.max_open_outputs
+        ):
+            self._close_output(next(iter(self.outputs)))
+        if identifier in self._closed_outputs and self.reopen_output is not None:
+            self.outputs[identifier] = self.reopen_output(identifier)
+        else:
+            self.outputs[identifier] = self.create_output(identifier)
+        self._batches[identifier] = []
+        self._batch_sizes[identifier] = 0
+
+    def _close_output(self, identifier: str):
+        """
+        Flushes and closes a single output, it is reopened by the next write to it.
+        """
+        self._flush_batch(identifier)
+        if self._writer_pool is not None:
+            self._writer_pool.join()
+        del self._batches[identifier]
+        del self._batch_sizes[identifier]
+        self.outputs.pop(identifier).close()
+        self._closed_outputs.add(identifier)
+
+    def schema_delta(self) -> dict[str, SchemaDelta]:
+        """
+        Returns the changes of the inferred schemas to the schemas given as `schemas`, see `Schema.delta`.
+
+        Only outputs with changes are included. Outputs which were not warm started are compared to an empty schema.
+        EX: `{'abc': {'2': ('int', 'c-int-str'), '3': (None, 'bool')}}`
+        """
+        schema_delta: dict[str, SchemaDelta] = {}
+        for identifier, schema in self.schemas.items():
+            delta = schema.delta(self._seed_schemas.get(identifier, {}))
+            if delta:
+                schema_delta[identifier] = delta
+        return schema_delta
+
+    def _get_schema(self, identifier: str) -> Schema | None:
+        """
+        Returns the schema to record the column types of the given output in while its rows are built.
+
+        None when `infer_schemas` is disabled, or when the output was warm started, whose rows
+        `_write_to_output` validates as a whole.
+        """
+        if not self.infer_schemas or identifier in self._seed_schemas:
+            return None
+        if identifier not in self.schemas:
+            self.schemas[identifier] = Schema()
+        return self.schemas[identifier]
+
+    def _list_helper(
+        self,
+        id: str | int,
+        index: int,
+        row: dict[str, object] | Any,
+        path: str,
+        schema: Schema | None = None,
+        rows: list[tuple[str, dict[str, Any]]] | None = None,
+    ):
         """
         Helper for relationalizing lists.
 
         Handles the difference between an array of literals and an array of structs.
+        Structs are copied, not modified, so the input hashes the same when it is relationalized again.
         """
         if isinstance(row, dict):
-            row[_ID] = id
-            row[_INDEX] = index
-            return self._relationalize(row, path=path)
+            row = {**row, _ID: id, _INDEX: index}
+            return self._relationalize(row, path=path, schema=schema, rows=rows)
 
-        return self._relationalize({_VAL: row, _ID: id, _INDEX: index}, path=path)
+        return self._relationalize(
+            {_VAL: row, _ID: id, _INDEX: index}, path=path, schema=schema, rows=rows
+        )
 
-    def _relationalize(self, d: list[Any] | dict[str, Any] | str, path: str = ""):
+    def _relationalize(
+        self,
+        d: list[Any] | dict[str, Any] | str,
+        path: str = "",
+        schema: Schema | None = None,
+        rows: list[tuple[str, dict[str, Any]]] | None = None,
+    ):
         """
-        Recursive back bone of the relationalize structure.
+        Back bone of the relationalize structure.
 
         Traverses any arbitrary JSON structure flattening and relationalizing.
+        Nested objects are walked with an explicit stack and every flattened key is written
+        straight into a single output row, so nesting depth costs neither recursion nor copies.
+        Only arrays, which produce rows of their own, start a new traversal.
+
+        Given a `schema`, the type of every column is recorded as the row is built.
         """
-        path_prefix = f"{path}{_DELIMITER}"
-        if path == "":
-            path_prefix = ""
-        if isinstance(d, list):
-            id = Relationalize._generate_rid()
-            for index, row in enumerate(d):
-                self._write_to_output(
-                    path, self._list_helper(id, index, row, path=path), is_sub=True
-                )
+        if not isinstance(d, dict):
+            if isinstance(d, list):
+                d = self._relationalize_list(d, path, rows=rows)
+            if schema is not None:
+                schema._read_write_object_key(path, d)
+            return {path: d}
+        if self._compile_plan is not None:
+            return self._relationalize_planned(d, path, schema, rows)
 
-            return {path: id}
+        record_type = schema._read_write_object_key if schema is not None else None
+        row: dict[str, object] = {}
+        stack = [(f"{path}{_DELIMITER}" if path else "", iter(d.items()))]
+        while stack:
+            path_prefix, items = stack[-1]
+            for key, value in items:
+                if isinstance(value, dict):
+                    # Descend into the nested object, resuming this one once it is exhausted.
+                    stack.append(
+                        (f"{path_prefix}{key}{_DELIMITER}", iter(value.items()))
+                    )
+                    break
+                column = f"{path_prefix}{key}"
+                if isinstance(value, list):
+                    value = self._relationalize_list(value, column, rows=rows)
+                row[column] = value
+                if record_type is not None:
+                    record_type(column, value)
+            else:
+                stack.pop()
+        return row
 
-        if isinstance(d, dict):
-            temp_d: dict[str, object] = {}
-            for key in d:
-                temp_d.update(self._relationalize(d[key], path=f"{path_prefix}{key}"))
-            return temp_d
+    def _relationalize_planned(
+        self,
+        d: dict[str, Any],
+        path: str,
+        schema: Schema | None = None,
+        rows: list[tuple[str, dict[str, Any]]] | None = None,
+    ):
+        """
+        Flattens an object using the plan compiled for its structure.
 
-        return {path: d}
+        A single pass collects the leaf values and the structural fingerprint,
+        the row is then assembled from the plan's precomputed column names.
+        """
+        values: list[Any] = []
+        shape: list[object] = []
+        stack = [iter(d.items())]
+        while stack:
+            for key, value in stack[-1]:
+                shape.append(key)
+                if isinstance(value, dict):
+                    shape.append(_OBJECT)
+                    stack.append(iter(value.items()))
+                    break
+                if isinstance(value, list):
+                    shape.append(_ARRAY)
+                values.append(value)
+            else:
+                stack.pop()
+                shape.append(_END)
 
-    def close_io(self) -> None:
-        for file_object in self.outputs.values():
-            file_object.close()
+        columns, arrays = self._compile_plan(path, tuple(shape))
+        for position, column, identifier in arrays:
+            values[position] = self._relationalize_list(
+                values[position], column, identifier, rows
+            )
+        if schema is not None:
+            for column, value in zip(columns, values):
+                schema._read_write_object_key(column, value)
+        return dict(zip(columns, values))
+
+    def _build_plan(self, path: str, shape: tuple[object, ...]):
+        """
+        Compiles a structural fingerprint into a flattening plan.
 
-    @staticmethod
-    def _generate_rid() -> str:
+        Returns the column name of every leaf value, in traversal order, and the position,
+        column name and sub-table identifier of every array.
         """
-        Generates a relationalize ID. EX:`R_2d0418f3b5de415086f1297cf0a9d9a5`
+        columns: list[str] = []
+        arrays: list[tuple[int, str, str]] = []
+        path_prefixes = [f"{path}{_DELIMITER}" if path else ""]
+        key: object = None
+        for token in shape:
+            if token is _END:
+                path_prefixes.pop()
+                continue
+            if token is _OBJECT:
+                # The key opened a nested object rather than naming a leaf value.
+                columns.pop()
+                path_prefixes.append(f"{path_prefixes[-1]}{key}{_DELIMITER}")
+                continue
+            if token is _ARRAY:
+                column = columns[-1]
+                identifier = f"{self.name}{_DELIMITER}{column}"
+                arrays.append((len(columns) - 1, column, identifier))
+                continue
+            key = token
+            columns.append(f"{path_prefixes[-1]}{key}")
+        return tuple(columns), tuple(arrays)
+
+    def plan_cache_info(self):
         """
-        return f"{_ID_PREFIX}{_DELIMITER}{uuid4().hex}"
+        Returns the hit/miss counters of the flattening plan cache, or None when it is disabled.
+        """
+        if self._compile_plan is None:
+            return None
+        return self._compile_plan.cache_info()
+
+    def _relationalize_list(
+        self,
+        d: list[Any],
+        path: str,
+        identifier: str | None = None,
+        rows: list[tuple[str, dict[str, Any]]] | None = None,
+    ) -> str | int:
+        """
+        Writes each item of a list to the sub-table for the given path.
+
+        Returns the relationalize ID linking the items back to their parent row.
+        """
+        if identifier is None:
+            identifier = f"{self.name}{_DELIMITER}{path}"
+        id = self.rid_generator(path, d)
+        if self.deduplicate_arrays:
+            key = (identifier, id)
+            if key in self._written_rids:
+                # An identical array was already written to this sub-table.
+                self._written_rids[key] = self._written_rids.pop(key)
+                return id
+            if len(self._written_rids) >= self.max_deduplicated_arrays:
+                del self._written_rids[next(iter(self._written_rids))]
+            self._written_rids[key] = None
+        if not d:
+            # An empty array writes no rows, which must not leave an empty schema behind.
+            return id
+        schema = self._get_schema(identifier)
+        for index, row in enumerate(d):
+            self._write_to_output(
+                identifier,
+                self._list_helper(id, index, row, path=path, schema=schema, rows=rows),
+                rows=rows,
+            )
+        return id
+
+    def close_io(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._writer_pool is not None:
+                self._writer_pool.close()
+            for file_object in self.outputs.values():
+                file_object.close()
@@ -0,0 +1,102 @@
+from hashlib import blake2b
+from itertools import count
+import json
+import os
+from typing import Any, Callable
+from uuid import uuid4
+
+RIDGenerator = Callable[[str, list[Any]], str | int]
+"""
+A `rid_generator` compatible Callable. Receives the path and contents of an array and returns its relationalize ID.
+Generators deriving the ID from the contents alone set a `content_addressed` attribute, see `is_content_addressed`.
+"""
+
+_RID_PREFIX = "R_"
+
+_SHARD_BITS = 23
+_COUNTER_BITS = 40
+
+
+def uuid_rids() -> RIDGenerator:
+    """
+    A `rid_generator` compatible Callable generating random uuid4 based relationalize IDs.
+    EX:`R_2d0418f3b5de415086f1297cf0a9d9a5`
+
+    This is the default.
+    """
+
+    def generate_uuid_rid(path: str, items: list[Any]) -> str:
+        return f"{_RID_PREFIX}{uuid4().hex}"
+
+    return generate_uuid_rid
+
+
+def sequential_rids(prefix: str | None = None) -> RIDGenerator:
+    """
+    A `rid_generator` compatible Callable generating relationalize IDs from a counter.
+    EX:`R_9f3b2c41d07e5a18_42`
+
+    The counter is scoped to the returned Callable and prefixed by `prefix`, a random run prefix by default.
+    Parallel shards stay unique as long as each gets its own prefix, which the random default provides.
+    """
+    if prefix is None:
+        prefix = os.urandom(8).hex()
+    next_value = count().__next__
+
+    def generate_sequential_rid(path: str, items: list[Any]) -> str:
+        return f"{_RID_PREFIX}{prefix}_{next_value()}"
+
+    return generate_sequential_rid
+
+
+def integer_rids(shard: int) -> RIDGenerator:
+    """
+    A `rid_generator` compatible Callable generating compact integer relationalize IDs, which fit a BIGINT.
+
+    The upper bits hold the shard (0 - 8388607) and the lower 40 bits a counter scoped to the returned Callable.
+    IDs are unique across parallel shards as long as each shard, and each run writing to the same tables,
+    is given a distinct `shard`. EX: the worker index.
+    Raises an `OverflowError` once the counter runs out, instead of continuing into the IDs of the next shard.
+    """
+    if not 0 <= shard < 2**_SHARD_BITS:
+        raise ValueError(f"shard must be between 0 and {2**_SHARD_BITS - 1}.")
+    next_value = count(shard << _COUNTER_BITS).__next__
+    end = (shard + 1) << _COUNTER_BITS
+
+    def generate_integer_rid(path: str, items: list[Any]) -> int:
+        value = next_value()
+        if value >= end:
+            raise OverflowError(f"integer_rids ran out of IDs for shard {shard}.")
+        return value
+
+    return generate_integer_rid
+
+
+def content_hash_rids(salt_with_path: bool = True) -> RIDGenerator:
+    """
+    A `rid_generator` compatible Callable generating content-addressed relationalize IDs.
+    EX:`R_5d41402abc4b2a76b9719d911017c592`
+
+    The ID is a hash of the canonical (key sorted) JSON contents of the array, salted with its path by default.
+    Identical arrays therefore share an ID and reprocessing the same input yields the same IDs.
+    Combine with `Relationalize(..., deduplicate_arrays=True)` to write identical arrays to their sub-table once.
+    """
+
+    def generate_content_hash_rid(path: str, items: list[Any]) -> str:
+        content = json.dumps(items, sort_keys=True, separators=(",", ":"), default=str)
+        digest = blake2b(digest_size=16)
+        if salt_with_path:
+            digest.update(path.encode())
+            digest.update(b"\0")
+        digest.update(content.encode())
+        return f"{_RID_PREFIX}{digest.hexdigest()}"
+
+    generate_content_hash_rid.content_addressed = True
+    return generate_content_hash_rid
+
+
+def is_content_addressed(rid_generator: RIDGenerator) -> bool:
+    """
+    Whether the `rid_generator` gives identical arrays the same relationalize ID, EX: `content_hash_rids`.
+    """
+    return getattr(rid_generator, "content_addressed", False)
@@ -0,0 +1,85 @@
+from collections.abc import Iterable, Iterator
+from itertools import islice
+import math
+import random
+import sys
+from typing import Any, Callable
+
+RowSampler = Callable[[Iterable[dict[str, Any]]], Iterable[dict[str, Any]]]
+"""
+A `Schema.read_sample` compatible Callable. Receives the rows of a collection and returns the rows to infer the schema from.
+"""
+
+
+def first_rows(count: int) -> RowSampler:
+    """
+    A `Schema.read_sample` compatible Callable sampling the first `count` rows.
+
+    The remaining rows are not consumed, so only `count` rows of a file or cursor are ever read.
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1.")
+
+    def sample_first_rows(rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        return islice(rows, count)
+
+    return sample_first_rows
+
+
+def every_kth_row(k: int, offset: int = 0) -> RowSampler:
+    """
+    A `Schema.read_sample` compatible Callable sampling every `k`-th row, starting at the row at `offset`.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1.")
+    if offset < 0:
+        raise ValueError("offset must not be negative.")
+
+    def sample_every_kth_row(
+        rows: Iterable[dict[str, Any]]
+    ) -> Iterator[dict[str, Any]]:
+        return islice(rows, offset, None, k)
+
+    return sample_every_kth_row
+
+
+def reservoir_rows(count: int, seed: int | None = None) -> RowSampler:
+    """
+    A `Schema.read_sample` compatible Callable sampling `count` rows uniformly at random from all rows.
+
+    Rows are drawn with reservoir sampling (Algorithm L), keeping at most `count` rows in memory
+    and drawing random numbers only for the rows which enter the reservoir.
+    Every row is consumed. Pass a `seed` to draw the same sample on every run.
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1.")
+
+    def sample_reservoir_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        generator = random.Random(seed)
+        iterator = iter(rows)
+        reservoir = list(islice(iterator, count))
+        if len(reservoir) < count:
+            return reservoir
+        weight = math.exp(math.log(_random_nonzero(generator)) / count)
+        while True:
+            # The number of rows to skip until the next one replaces a row of the reservoir.
+            skip = math.floor(
+                math.log(_random_nonzero(generator)) / math.log1p(-weight)
+            )
+            row = next(islice(iterator, min(skip, sys.maxsize), None), None)
+            if row is None:
+                return reservoir
+            reservoir[generator.randrange(count)] = row
+            weight *= math.exp(math.log(_random_nonzero(generator)) / count)
+
+    return sample_reservoir_rows
+
+
+def _random_nonzero(generator: random.Random) -> float:
+    """
+    Returns a random float in the interval (0, 1), which unlike 0 has a logarithm.
+    """
+    value = generator.random()
+    while value == 0.0:
+        value = generator.random()
+    return value
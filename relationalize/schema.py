@@ -1,18 +1,177 @@
-import json
-from typing import Any, Final, Generic, TypeVar, cast
+from collections.abc import Iterable, Iterator, Mapping, Sized
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+import csv
+import os
+import shutil
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Final,
+    Generic,
+    TextIO,
+    TypeVar,
+    cast,
+    get_args,
+)
 
 from relationalize.types import BaseSupportedColumnType, ChoiceColumnType, ColumnType, UnsupportedColumnType, is_choice_column_type
 
+from .sampling import RowSampler
+from .serializers import DEFAULT_SERIALIZER, Serializer
 from .sql_dialects import PostgresDialect, SQLDialect
 
 DialectColumnType = TypeVar('DialectColumnType')
 
+SchemaDelta = dict[str, tuple[ColumnType | None, ColumnType | None]]
+"""
+The changed columns of a schema, mapped to their previous and current type (None when absent). See `Schema.delta`.
+"""
+
 ALLOWED_COLUMN_CHARS: Final[set[str]] = {" ", "-", "_"}
 DEFAULT_SQL_DIALECT = PostgresDialect()
+DEFAULT_CONVERT_BATCH_SIZE = 1000
+DEFAULT_SHAPE_MEMO_SIZE = 1024
+CONVERT_FORMATS: Final[set[str]] = {"json", "csv"}
+# What `convert_stream` does with a row which does not fit the schema, see `Schema.fits_object`.
+MISMATCH_MODES: Final[set[str]] = {"raise", "reject", "widen"}
+
+# The Python types `Schema._parse_type` maps to each supported column type.
+_PYTHON_TYPES: Final[dict[str, type]] = {
+    "bool": bool,
+    "float": float,
+    "int": int,
+    "str": str,
+}
+
+# Every supported column type as a single bit, assigned in the order of the type names, so a choice
+# of types is a bitmask whose set bits are already sorted. Bitmask 0 marks types without a bit (unsupported).
+_TYPE_BITS: Final[dict[str, int]] = {
+    name: 1 << index
+    for index, name in enumerate(sorted(get_args(BaseSupportedColumnType)))
+}
+_NONE_BIT: Final[int] = _TYPE_BITS["none"]
+_VALUE_TYPE_BITS: Final[dict[type, int]] = {
+    bool: _TYPE_BITS["bool"],
+    float: _TYPE_BITS["float"],
+    int: _TYPE_BITS["int"],
+    str: _TYPE_BITS["str"],
+    type(None): _NONE_BIT,
+}
+# A value of each of the types in `_VALUE_TYPE_BITS`.
+_TYPE_VALUES: Final[dict[type, object]] = {
+    bool: False,
+    float: 0.0,
+    int: 0,
+    str: "",
+    type(None): None,
+}
+# A value of the type each NumPy style `dtype.kind` holds, EX: "i" for int64 arrays.
+_DTYPE_KIND_VALUES: Final[dict[str, object]] = {
+    "b": False,
+    "f": 0.0,
+    "i": 0,
+    "u": 0,
+    "U": "",
+}
+# The column type of every bitmask, EX: `c-int-str`.
+_MASK_TYPES: Final[dict[int, ColumnType]] = {}
+for _mask in range(1, 1 << len(_TYPE_BITS)):
+    _names = [name for name, bit in _TYPE_BITS.items() if _mask & bit]
+    _MASK_TYPES[_mask] = (
+        cast(BaseSupportedColumnType, _names[0])
+        if len(_names) == 1
+        else ChoiceColumnType(f"c-{'-'.join(_names)}")
+    )
+# The bitmask of every column type seen so far, starting with the canonical ones.
+_TYPE_MASKS: dict[str, int] = {
+    value_type: mask for mask, value_type in _MASK_TYPES.items()
+}
+
+
+def _type_mask(value_type: str) -> int:
+    """
+    Returns the bitmask of a column type, or 0 when the type (or one of its choices) is not supported.
+    """
+    if value_type not in _TYPE_MASKS:
+        names = (
+            value_type[2:].split("-")
+            if is_choice_column_type(value_type)
+            else [value_type]
+        )
+        mask = 0
+        for name in names:
+            if name not in _TYPE_BITS:
+                mask = 0
+                break
+            mask |= _TYPE_BITS[name]
+        _TYPE_MASKS[value_type] = mask
+    return _TYPE_MASKS[value_type]
+
+
+class _SchemaDict(dict[str, ColumnType]):
+    """
+    The dict behind `Schema.schema`, counting its changes in `version`, so the caches derived
+    from it notice changes made to `schema` directly as well.
+    """
+
+    __slots__ = ("version",)
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __reduce__(self):
+        # Unpickling would set the items before `version`.
+        return (_SchemaDict, (dict(self),))
+
+    def __setitem__(self, key: str, value: ColumnType):
+        self.version += 1
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str):
+        self.version += 1
+        super().__delitem__(key)
+
+    def __ior__(self, other: Any):
+        self.version += 1
+        return super().__ior__(other)
+
+    def pop(self, *args: Any) -> Any:
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self) -> tuple[str, ColumnType]:
+        self.version += 1
+        return super().popitem()
+
+    def clear(self):
+        self.version += 1
+        super().clear()
+
+    def update(self, *args: Any, **kwargs: Any):
+        self.version += 1
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        self.version += 1
+        return super().setdefault(key, default)
+
+
+class SchemaMismatchError(Exception):
+    """
+    Raised when an object holds a column or a value type which is not part of the schema.
+    """
+
 
 class Schema(Generic[DialectColumnType]):
     """
     A choice-supporting schema for a flattened JSON object.
+
+    `schema` maps every column to its type name, EX: `int` or the choice `c-int-str`.
+    Internally every type name maps to a bitmask (memoized by name), so reading objects and merging schemas
+    compare integers instead of parsing type names.
     """
 
     _CHOICE_SEQUENCE: str = "c-"
@@ -22,22 +181,324 @@ class Schema(Generic[DialectColumnType]):
         self,
         schema: dict[str, ColumnType] | None = None,
         sql_dialect: SQLDialect[DialectColumnType] = DEFAULT_SQL_DIALECT,
+        shape_memo_size: int = DEFAULT_SHAPE_MEMO_SIZE,
     ):
+        """
+        `shape_memo_size` bounds the number of row shapes, the keys and value types of a row,
+        `read_object` remembers as merged. 0 disables the memo.
+        """
         if schema is None:
             schema = dict()
-        self.schema = schema
         self.sql_dialect = sql_dialect
+        self.shape_memo_size = shape_memo_size
+        self._merged_shapes: set[tuple[tuple[str, ...], tuple[type, ...]]] = set()
+        # The `version` of `schema` the merged shapes were merged into.
+        self._merged_shapes_version = 0
+        self._converter: Callable[[dict[str, Any]], dict[str, Any]] | None = None
+        # The `version` of `schema` the converter was compiled for.
+        self._converter_version = 0
+        self.schema = schema
+
+    @property
+    def schema(self) -> dict[str, ColumnType]:
+        return self._schema
+
+    @schema.setter
+    def schema(self, schema: dict[str, ColumnType]):
+        # A plain dict is copied into a `_SchemaDict`, which tracks its changes.
+        self._schema = (
+            schema if isinstance(schema, _SchemaDict) else _SchemaDict(schema)
+        )
+        self._converter = None
+        self._merged_shapes = set()
 
     def convert_object(self, record: dict[str, Any]) -> dict[str, Any]:
         """
         Convert a given object according to the schema.
         Splits choice-columns into N seperate columns and renames keys accordingly.
 
-        Chooses between schema-iteration and object-iteration depending on which one will be more efficient.
+        Uses the converter compiled by `compile_converter`.
+        """
+        return self.compile_converter()(record)
+
+    def compile_converter(self) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        """
+        Returns a callable converting objects like `convert_object`, compiled for the current schema.
+
+        Every column is resolved up front, a choice column into the output column name for each of its types,
+        so converting an object only takes dict lookups keyed on `type(value)`.
+        The converter is cached until the schema changes, including changes made to `schema` directly.
         """
-        if len(self.schema) > len(record):
-            return self._convert_object_object_iteration(record)
-        return self._convert_object_schema_iteration(record)
+        if self._converter is None or self._converter_version != self._schema.version:
+            self._converter = self._build_converter()
+            self._converter_version = self._schema.version
+        return self._converter
+
+    def _build_converter(self) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        """
+        Compiles the converter returned by `compile_converter`.
+
+        Behaves like `_convert_object_schema_iteration`, or like `_convert_object_object_iteration`
+        when the schema has more columns than the object, including the order of the output keys.
+        """
+        # None for a non-choice column, else the output column by Python type.
+        columns: dict[str, dict[type, str] | None] = {}
+        for key, value_type in self.schema.items():
+            if not is_choice_column_type(value_type):
+                columns[key] = None
+                continue
+            columns[key] = {
+                _PYTHON_TYPES[choice_type]: f"{key}_{choice_type}"
+                for choice_type in value_type[2:].split(Schema._CHOICE_DELIMITER)
+                if choice_type in _PYTHON_TYPES
+            }
+        column_items = tuple(columns.items())
+        column_count = len(columns)
+        unknown_column: dict[type, str] = {}
+
+        def choice_column(key: str, object_value: object) -> str:
+            # Subclasses of the supported types, or types which are not part of the choice.
+            object_value_type = self._parse_type(object_value)
+            value_type = self.schema[key]
+            if object_value_type not in value_type:
+                raise SchemaMismatchError(
+                    (
+                        "Unknown type found within object. But not within the schema.\n"
+                        f"schema types: {value_type}\n"
+                        f"object type: {object_value_type}"
+                    )
+                )
+            return f"{key}_{object_value_type}"
+
+        def convert(record: dict[str, Any]) -> dict[str, Any]:
+            output_object: dict[str, Any] = {}
+            if column_count > len(record):
+                for key, object_value in record.items():
+                    if object_value is None:
+                        output_object[key] = object_value
+                        continue
+                    choices = columns.get(key, unknown_column)
+                    if choices is None:
+                        output_object[key] = object_value
+                    elif choices is not unknown_column:
+                        output_key = choices.get(type(object_value))
+                        if output_key is None:
+                            output_key = choice_column(key, object_value)
+                        output_object[output_key] = object_value
+                return output_object
+
+            for key, choices in column_items:
+                if key not in record:
+                    continue
+                object_value = record[key]
+                if choices is None or object_value is None:
+                    output_object[key] = object_value
+                    continue
+                output_key = choices.get(type(object_value))
+                if output_key is None:
+                    output_key = choice_column(key, object_value)
+                output_object[output_key] = object_value
+            return output_object
+
+        return convert
+
+    def convert_stream(
+        self,
+        input_lines: Iterable[str | bytes],
+        output: TextIO,
+        format: str = "json",
+        batch_size: int = DEFAULT_CONVERT_BATCH_SIZE,
+        serializer: Serializer = DEFAULT_SERIALIZER,
+        write_header: bool = True,
+        on_mismatch: str | None = None,
+        rejects: TextIO | None = None,
+    ) -> int:
+        """
+        Converts newline delimited JSON objects, EX: the lines of a relationalized output, into `output`.
+
+        `format` is either `json`, writing newline delimited JSON, or `csv`, writing the columns of
+        `generate_output_columns` (with a header row unless `write_header` is False), null values as empty fields.
+        Rows are converted and written `batch_size` at a time, so memory use does not depend on the input size.
+
+        `on_mismatch` checks every row with `fits_object`, EX: when the schema was inferred from a sample.
+        Rows which do not fit are handled by the mode:
+        `raise` raises a `SchemaMismatchError`, `reject` writes the row's line to `rejects` instead of `output`
+        and `widen` merges the row into the schema before converting it (`json` only). Widening only adds columns,
+        EX: a new column or a column of `none` type receiving a type, so `generate_output_columns`/`generate_ddl`
+        describe all rows once done. A row which would turn a column into a choice column, renaming the column of
+        the rows converted before, is written to `rejects` if given and raises a `SchemaMismatchError` otherwise.
+        By default rows are not checked: values of another type are written as they are and unknown columns are dropped.
+
+        Returns the number of rows written.
+        """
+        if format not in CONVERT_FORMATS:
+            raise ValueError(f"Unknown convert format: {format}")
+        if on_mismatch is not None and on_mismatch not in MISMATCH_MODES:
+            raise ValueError(f"Unknown mismatch mode: {on_mismatch}")
+        if on_mismatch == "reject" and rejects is None:
+            raise ValueError("on_mismatch='reject' requires a rejects output.")
+        if on_mismatch == "widen" and format == "csv":
+            raise ValueError("on_mismatch='widen' can not change the columns of a csv.")
+        converter = self.compile_converter()
+        csv_writer = None
+        if format == "csv":
+            # `None` values keep the key of their choice column, which has no CSV column of its own.
+            csv_writer = csv.DictWriter(
+                output, self.generate_output_columns(), extrasaction="ignore"
+            )
+            if write_header:
+                csv_writer.writeheader()
+
+        row_count = 0
+        batch: list[Any] = []
+        for line in input_lines:
+            if not line.strip():
+                continue
+            record = serializer.loads(line)
+            if on_mismatch is not None and not self.fits_object(record):
+                if on_mismatch == "raise":
+                    raise SchemaMismatchError(self._describe_mismatch(record))
+                if on_mismatch == "widen" and self._widens_columns(record):
+                    self.read_object(record)
+                    converter = self.compile_converter()
+                else:
+                    if rejects is None:
+                        raise SchemaMismatchError(
+                            "Widening would rename the columns of the rows converted before.\n"
+                            f"{self._describe_mismatch(record)}"
+                        )
+                    if isinstance(line, bytes):
+                        line = line.decode()
+                    _ = rejects.write(f"{line.rstrip()}\n")
+                    continue
+            converted_object = converter(record)
+            if csv_writer is None:
+                batch.append(serializer.dumps(converted_object))
+            else:
+                batch.append(converted_object)
+            if len(batch) >= batch_size:
+                row_count += self._write_converted_batch(batch, output, csv_writer)
+        row_count += self._write_converted_batch(batch, output, csv_writer)
+        return row_count
+
+    def convert_file(
+        self,
+        input_path: str,
+        output_path: str,
+        format: str = "json",
+        batch_size: int = DEFAULT_CONVERT_BATCH_SIZE,
+        serializer: Serializer = DEFAULT_SERIALIZER,
+        workers: int = 1,
+        on_mismatch: str | None = None,
+        rejects_path: str | None = None,
+    ) -> int:
+        """
+        Converts a newline delimited JSON file into `output_path`, see `convert_stream`.
+
+        With more than one worker the file is split into newline aligned byte ranges, which are
+        converted by a pool of `workers` processes into temporary parts and then concatenated in order.
+        `serializer` must be picklable in that case.
+
+        `on_mismatch` is either `raise` or `reject`, which writes the lines of the rows not fitting the schema
+        to `rejects_path`. Widening is only supported by `convert_stream`, as workers would widen their own copies.
+
+        Returns the number of rows written.
+        """
+        if format not in CONVERT_FORMATS:
+            raise ValueError(f"Unknown convert format: {format}")
+        if on_mismatch == "widen" or (
+            on_mismatch is not None and on_mismatch not in MISMATCH_MODES
+        ):
+            raise ValueError(f"Unsupported mismatch mode: {on_mismatch}")
+        if on_mismatch == "reject" and rejects_path is None:
+            raise ValueError("on_mismatch='reject' requires a rejects_path.")
+        if on_mismatch != "reject":
+            rejects_path = None
+        byte_ranges: list[tuple[str, int, int]] = []
+        if workers > 1:
+            # Imported here, as `parallel` depends on this module.
+            from .parallel import split_ndjson
+
+            byte_ranges = split_ndjson(input_path, workers)
+        if len(byte_ranges) <= 1:
+            return _convert_file_range(
+                (
+                    self.schema,
+                    input_path,
+                    0,
+                    os.path.getsize(input_path),
+                    output_path,
+                    format,
+                    batch_size,
+                    serializer,
+                    True,
+                    on_mismatch,
+                    rejects_path,
+                )
+            )
+
+        tasks = [
+            (
+                self.schema,
+                input_path,
+                start,
+                end,
+                f"{output_path}.part-{index:05d}",
+                format,
+                batch_size,
+                serializer,
+                index == 0,
+                on_mismatch,
+                None if rejects_path is None else f"{rejects_path}.part-{index:05d}",
+            )
+            for index, (_, start, end) in enumerate(byte_ranges)
+        ]
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                row_count = sum(executor.map(_convert_file_range, tasks))
+            with open(output_path, "wb") as output:
+                for task in tasks:
+                    with open(task[4], "rb") as part:
+                        shutil.copyfileobj(part, output)
+            if rejects_path is not None:
+                with open(rejects_path, "wb") as rejects:
+                    for task in tasks:
+                        with open(cast(str, task[10]), "rb") as part:
+                            shutil.copyfileobj(part, rejects)
+        finally:
+            for task in tasks:
+                for path in (task[4], task[10]):
+                    if path is not None and os.path.exists(path):
+                        os.remove(path)
+        return row_count
+
+    def _widens_columns(self, record: dict[str, object]) -> bool:
+        """
+        Whether merging the object into this schema keeps every output column, only adding new ones.
+        """
+        widened_schema = Schema(dict(self.schema), shape_memo_size=0)
+        widened_schema.read_object(record)
+        return set(self.generate_output_columns()) <= set(
+            widened_schema.generate_output_columns()
+        )
+
+    @staticmethod
+    def _write_converted_batch(
+        batch: list[Any], output: TextIO, csv_writer: csv.DictWriter | None
+    ) -> int:
+        """
+        Writes a batch of converted rows, serialized ones for JSON, with a single `write` and clears it.
+        """
+        row_count = len(batch)
+        if not batch:
+            return row_count
+        if csv_writer is None:
+            batch.append("")
+            _ = output.write("\n".join(batch))
+        else:
+            csv_writer.writerows(batch)
+        batch.clear()
+        return row_count
 
     def _convert_object_schema_iteration(
         self, record: dict[str, object]
@@ -54,7 +515,7 @@ class Schema(Generic[DialectColumnType]):
                 # determine which type this object is and enter into correct sub-column
                 object_value_type = self._parse_type(object_value)
                 if object_value_type not in value_type:
-                    raise Exception(
+                    raise SchemaMismatchError(
                         (
                             "Unknown type found within object. But not within the schema.\n"
                             f"schema types: {value_type}\n"
@@ -82,7 +543,7 @@ class Schema(Generic[DialectColumnType]):
                 # determine which type this object is and enter into correct sub-column
                 object_value_type = self._parse_type(object_value)
                 if object_value_type not in value_type:
-                    raise Exception(
+                    raise SchemaMismatchError(
                         (
                             "Unknown type found within object. But not within the schema.\n"
                             f"schema types: {value_type}\n"
@@ -118,28 +579,73 @@ class Schema(Generic[DialectColumnType]):
         Generates a CREATE TABLE statement for this schema.
         Breaking out choice columns into seperate columns.
         """
-        columns: list[str] = []
+        columns: list[str] = [
+            self.sql_dialect.generate_ddl_column(column, column_type)
+            for column, column_type in self._generate_ddl_column_types().items()
+        ]
+        columns.sort()
+        return self.sql_dialect.generate_ddl(schema, table, columns)
+
+    def generate_alter_ddl(
+        self,
+        previous: "Schema | dict[str, ColumnType]",
+        table: str,
+        schema: str = "public",
+    ) -> list[str]:
+        """
+        Generates the ALTER TABLE statements evolving a table created for a previous version of this schema
+        (by `generate_ddl`) into one holding the output columns of this schema. Empty when nothing changed.
+
+        Every new output column is added, including the choice sub-columns of a column which became,
+        or gained a type as, a choice column. EX: `int` to `c-int-str` adds `{key}_int` and `{key}_str`.
+        A column whose type conflicts with its previous type, EX: `int` in a schema inferred from scratch
+        and `str` before, becomes a choice of both, as in `Schema.merge(previous, self)`.
+        Convert the new rows with that merged schema, so they fit the evolved table.
+        Columns are never dropped, so the rows loaded before keep their columns.
+        A column which only held nulls (`none`) changes its type once it holds values.
+        """
+        if not isinstance(previous, Schema):
+            previous = Schema(previous, sql_dialect=self.sql_dialect)
+        merged_schema: Schema[DialectColumnType] = Schema.merge(previous, self)
+        merged_schema.sql_dialect = self.sql_dialect
+        previous_column_types = previous._generate_ddl_column_types()
+        add_columns: list[str] = []
+        alter_columns: list[tuple[str, DialectColumnType]] = []
+        for column, column_type in merged_schema._generate_ddl_column_types().items():
+            if column not in previous_column_types:
+                add_columns.append(
+                    self.sql_dialect.generate_ddl_column(column, column_type)
+                )
+            elif (
+                previous_column_types[column] != column_type
+                and previous.schema.get(column) == "none"
+            ):
+                alter_columns.append((column, column_type))
+        add_columns.sort()
+        alter_columns.sort()
+        return self.sql_dialect.generate_alter_ddl(
+            schema, table, add_columns, alter_columns
+        )
+
+    def _generate_ddl_column_types(self) -> dict[str, DialectColumnType]:
+        """
+        Maps the output columns of this schema to their type in the SQL dialect.
+        Breaking out choice columns into seperate columns.
+        """
+        column_types: dict[str, DialectColumnType] = {}
         for key, value_type in self.schema.items():
             if Schema._CHOICE_SEQUENCE not in value_type:
                 # Column is not a choice column
-                columns.append(
-                    self.sql_dialect.generate_ddl_column(
-                        key, self.sql_dialect.type_column_mapping[value_type]
-                    )
-                )
+                column_types[key] = self.sql_dialect.type_column_mapping[value_type]
                 continue
             # Generate a column per choice-type
             for choice_type in cast(list[BaseSupportedColumnType], value_type[2:].split(Schema._CHOICE_DELIMITER)):
                 if choice_type == "none":
                     continue
-                columns.append(
-                    self.sql_dialect.generate_ddl_column(
-                        f"{key}_{choice_type}",
-                        self.sql_dialect.type_column_mapping[choice_type],
-                    )
-                )
-        columns.sort()
-        return self.sql_dialect.generate_ddl(schema, table, columns)
+                column_types[
+                    f"{key}_{choice_type}"
+                ] = self.sql_dialect.type_column_mapping[choice_type]
+        return column_types
 
     def drop_null_columns(self) -> int:
         """
@@ -194,25 +700,239 @@ class Schema(Generic[DialectColumnType]):
     def read_object(self, record: dict[str, object]):
         """
         Read an object and merge into the current schema.
+
+        Merging a value only ever widens the type of its column, so an object with the same keys and value types
+        as an object merged before cannot change the schema. Those objects are skipped.
+        The memo is cleared whenever the schema was changed in between, EX: by dropping a column.
         """
+        if self.shape_memo_size <= 0:
+            for key, value in record.items():
+                self._read_write_object_key(key, value)
+            return
+        if self._merged_shapes_version != self._schema.version:
+            self._merged_shapes.clear()
+        shape = (tuple(record), tuple(map(type, record.values())))
+        if shape in self._merged_shapes:
+            return
         for key, value in record.items():
             self._read_write_object_key(key, value)
+        if len(self._merged_shapes) >= self.shape_memo_size:
+            self._merged_shapes.clear()
+        self._merged_shapes.add(shape)
+        self._merged_shapes_version = self._schema.version
+
+    def read_batch(self, rows: Iterable[dict[str, object]]):
+        """
+        Read a batch of objects and merge them into the current schema, like calling `read_object` for each.
+
+        The objects are grouped by their keys and transposed into columns, see `read_columns`.
+        """
+        shapes: dict[tuple[str, ...], list[dict[str, object]]] = {}
+        for row in rows:
+            keys = tuple(row)
+            if keys not in shapes:
+                shapes[keys] = []
+            shapes[keys].append(row)
+        for keys, shape_rows in shapes.items():
+            columns = zip(*(row.values() for row in shape_rows))
+            for key, values in zip(keys, columns):
+                self._read_column(key, values)
+
+    def read_columns(self, columns: Mapping[str, Iterable[Any]]):
+        """
+        Read a batch of objects given as columns, EX: `dict(data_frame.items())`, and merge them into the current schema.
+
+        Each column is reduced to a single value per distinct `type()`, so only those are merged.
+        Arrays with a numeric, boolean or unicode `dtype` (NumPy arrays, pandas Series) are merged
+        by their `dtype.kind` without looking at their values.
+        """
+        for key, values in columns.items():
+            self._read_column(key, values)
+
+    def read_sample(
+        self, rows: Iterable[dict[str, object]], sampler: RowSampler
+    ) -> int:
+        """
+        Infer the schema from a sample of the rows, EX: `schema.read_sample(rows, first_rows(10000))`.
+
+        `sampler` is one of the strategies in `relationalize.sampling`. Rows outside the sample may not fit
+        the schema, so convert them with an `on_mismatch` mode, see `convert_stream`.
+
+        Returns the number of sampled rows.
+        """
+        row_count = 0
+        for row in sampler(rows):
+            self.read_object(row)
+            row_count += 1
+        return row_count
+
+    def fits_object(self, record: dict[str, object]) -> bool:
+        """
+        Whether every column of the object is in the schema and holds a value of one of the column's types (or `None`).
+
+        Reading an object which fits does not change the schema.
+        """
+        schema = self.schema
+        for key, value in record.items():
+            column_type = schema.get(key)
+            if column_type is None:
+                return False
+            mask = _type_mask(column_type)
+            bit = _VALUE_TYPE_BITS.get(type(value))
+            if bit is None:
+                value_type = Schema._parse_type(value)
+                bit = _TYPE_BITS.get(value_type)
+                if bit is None:
+                    if value_type != self.schema[key]:
+                        return False
+                    continue
+            if not mask & bit and bit != _NONE_BIT:
+                return False
+        return True
 
-    def serialize(self) -> str:
+    def _describe_mismatch(self, record: dict[str, object]) -> str:
+        """
+        Describes the first column of an object which does not fit the schema, see `fits_object`.
+        """
+        for key, value in record.items():
+            if not self.fits_object({key: value}):
+                if key not in self.schema:
+                    return f"Column not within the schema: {key}"
+                return (
+                    "Unknown type found within object. But not within the schema.\n"
+                    f"column: {key}\n"
+                    f"schema types: {self.schema[key]}\n"
+                    f"object type: {Schema._parse_type(value)}"
+                )
+        return "Object fits the schema."
+
+    def _read_column(self, key: str, values: Iterable[Any]):
+        kind = getattr(getattr(values, "dtype", None), "kind", None)
+        if kind in _DTYPE_KIND_VALUES:
+            if len(cast(Sized, values)):
+                self._read_write_object_key(key, _DTYPE_KIND_VALUES[kind])
+            return
+        if isinstance(values, Iterator):
+            values = list(values)
+        for value_type in set(map(type, values)):
+            if value_type in _TYPE_VALUES:
+                self._read_write_object_key(key, _TYPE_VALUES[value_type])
+                continue
+            # Subclasses and unsupported types are merged by one of their values.
+            value = next(value for value in values if type(value) is value_type)
+            self._read_write_object_key(key, value)
+
+    def delta(self, previous: "Schema | dict[str, ColumnType]") -> SchemaDelta:
+        """
+        Returns the columns which were added, dropped or changed type since a previous version of this schema.
+
+        Maps each to its previous and current type, None for an added or dropped column.
+        EX: `{'2': ('int', 'c-int-str'), '3': (None, 'bool')}`
+        """
+        previous_schema = previous.schema if isinstance(previous, Schema) else previous
+        delta: SchemaDelta = {}
+        for key, value_type in self.schema.items():
+            previous_type = previous_schema.get(key)
+            if previous_type != value_type:
+                delta[key] = (previous_type, value_type)
+        for key, previous_type in previous_schema.items():
+            if key not in self.schema:
+                delta[key] = (previous_type, None)
+        return delta
+
+    def serialize(self, serializer: Serializer = DEFAULT_SERIALIZER) -> str:
         """
         Serialize this schema to a string.
         """
-        return json.dumps(self.schema)
+        return serializer.dumps(self.schema)
 
     @staticmethod
-    def deserialize(content: str):
+    def deserialize(content: str, serializer: Serializer = DEFAULT_SERIALIZER):
         """
         Create a new Schema class instance from a serialized schema.
         """
-        return Schema(schema=json.loads(content))
+        return Schema(schema=serializer.loads(content))
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes this schema in a compact binary form, EX: to ship it between processes. See `from_bytes`.
+
+        Every column is encoded as its length prefixed UTF-8 name followed by its type bitmask in a single byte.
+        Types without a bitmask (or not in their canonical form) follow a 0 byte as their length prefixed name.
+        """
+        content = bytearray()
+        for key, value_type in self.schema.items():
+            _write_string(content, key)
+            mask = _type_mask(value_type)
+            if mask != 0 and _MASK_TYPES[mask] == value_type:
+                content.append(mask)
+                continue
+            content.append(0)
+            _write_string(content, value_type)
+        return bytes(content)
+
+    @staticmethod
+    def from_bytes(content: bytes):
+        """
+        Create a new Schema class instance from a schema encoded by `to_bytes`.
+        """
+        schema: dict[str, ColumnType] = {}
+        position = 0
+        while position < len(content):
+            key, position = _read_string(content, position)
+            mask = content[position]
+            position += 1
+            if mask != 0:
+                schema[key] = _MASK_TYPES[mask]
+                continue
+            value_type, position = _read_string(content, position)
+            schema[key] = cast(ColumnType, value_type)
+        return Schema(schema=schema)
 
     def _read_write_object_key(self, key: str, value: object):
-        value_type = Schema._parse_type(value)
+        bit = _VALUE_TYPE_BITS.get(type(value))
+        if bit is None:
+            # A subclass of a supported type, or an unsupported type.
+            value_type = Schema._parse_type(value)
+            bit = _TYPE_BITS.get(value_type)
+            if bit is None:
+                self._read_write_object_key_type(key, value_type)
+                return
+        column_type = self._schema.get(key)
+        if column_type is None:
+            # Key has not been encountered yet. Set type in schema to type of value.
+            self._write_mask(key, bit)
+            return
+        mask = _TYPE_MASKS.get(column_type)
+        if mask is None:
+            mask = _type_mask(column_type)
+        if mask & bit:
+            # The type of value is the type of this key, or one of its choices. Do Nothing.
+            return
+        if mask == 0:
+            # The entry in schema contains an unsupported type.
+            self._read_write_object_key_type(key, _MASK_TYPES[bit])
+            return
+        if mask == _NONE_BIT:
+            # Entry in schema for this key is `none`. Set type in schema to type of value.
+            self._write_mask(key, bit)
+            return
+        if bit == _NONE_BIT:
+            # Value type is `none` but existing entry in schema exists. Do Nothing.
+            return
+        # Add the type of value to the choice, which never includes `none`.
+        self._write_mask(key, (mask | bit) & ~_NONE_BIT)
+
+    def _write_mask(self, key: str, mask: int):
+        self.schema[key] = _MASK_TYPES[mask]
+
+    def _read_write_object_key_type(self, key: str, value_type: ColumnType):
+        """
+        Merges a type into a column by its name. Used for the types without a bitmask.
+        """
+        self._read_write_type_name(key, value_type)
+
+    def _read_write_type_name(self, key: str, value_type: ColumnType):
         if key not in self.schema:
             # Key has not been encountered yet. Set type in schema to type of value.
             self.schema[key] = value_type
@@ -257,49 +977,73 @@ class Schema(Generic[DialectColumnType]):
         ] = ChoiceColumnType(f"{Schema._CHOICE_SEQUENCE}{Schema._CHOICE_DELIMITER.join(sorted([self.schema[key], value_type]))}")
 
     @staticmethod
-    def merge(*args: dict[str, ColumnType]):
+    def merge(*args: "dict[str, ColumnType] | Schema"):
         """
-        Create a new Schema object from multiple serialized schemas merging them together.
+        Create a new Schema object from multiple serialized schemas (or Schema objects) merging them together.
         """
-        merged_schema: dict[str, ColumnType] = {}
+        merged_schema: Schema = Schema()
         for schema in args:
-            for key, value_type in schema.items():
-                if key not in merged_schema:
-                    merged_schema[key] = value_type
-                    continue
-                if value_type == merged_schema[key]:
-                    continue
+            merged_schema.merge_in(schema)
+        return merged_schema
 
-                # key is in the new schema already and has different type
-                choices: set[str] = set()
-                if Schema._CHOICE_SEQUENCE in merged_schema[key]:
-                    for t in merged_schema[key][2:].split(Schema._CHOICE_DELIMITER):
-                        if t == "none":
-                            continue
-                        choices.add(t)
-                else:
-                    choices.add(merged_schema[key])
-                if Schema._CHOICE_SEQUENCE in value_type:
-                    for t in value_type[2:].split(Schema._CHOICE_DELIMITER):
-                        if t == "none":
-                            continue
-                        choices.add(t)
-                else:
-                    choices.add(value_type)
+    def merge_in(self, other: "dict[str, ColumnType] | Schema") -> "Schema":
+        """
+        Merges a serialized schema, or another Schema object, into this schema in place.
+
+        Returns this schema, EX: `Schema().merge_in(shard_1).merge_in(shard_2)`.
+        """
+        other_schema = other.schema if isinstance(other, Schema) else other
+        for key, value_type in other_schema.items():
+            merged_type = self.schema.get(key)
+            if merged_type is None:
+                self.schema[key] = value_type
+                continue
+            if value_type == merged_type:
+                continue
 
-                if "none" in choices:
-                    choices.remove("none")
-                if len(choices) == 0:
-                    merged_schema[key] = "none"
+            # key is in the schema already and has different type
+            mask = _type_mask(value_type)
+            merged_mask = _type_mask(merged_type)
+            if mask == 0 or merged_mask == 0:
+                self.schema[key] = Schema._merge_type_names(merged_type, value_type)
+                continue
+            # The choices of both types, without `none` unless neither has any other type.
+            mask = (merged_mask | mask) & ~_NONE_BIT or _NONE_BIT
+            if mask != merged_mask or _MASK_TYPES[mask] != merged_type:
+                self._write_mask(key, mask)
+        return self
+
+    @staticmethod
+    def _merge_type_names(
+        merged_type: ColumnType, value_type: ColumnType
+    ) -> ColumnType:
+        """
+        Merges two different types by their names. Used for the types without a bitmask.
+        """
+        choices: set[str] = set()
+        if Schema._CHOICE_SEQUENCE in merged_type:
+            for t in merged_type[2:].split(Schema._CHOICE_DELIMITER):
+                if t == "none":
                     continue
-                if len(choices) == 1:
-                    merged_schema[key] = cast(BaseSupportedColumnType, choices.pop())
+                choices.add(t)
+        else:
+            choices.add(merged_type)
+        if Schema._CHOICE_SEQUENCE in value_type:
+            for t in value_type[2:].split(Schema._CHOICE_DELIMITER):
+                if t == "none":
                     continue
+                choices.add(t)
+        else:
+            choices.add(value_type)
+
+        if "none" in choices:
+            choices.remove("none")
+        if len(choices) == 0:
+            return "none"
+        if len(choices) == 1:
+            return cast(BaseSupportedColumnType, choices.pop())
 
-                merged_schema[
-                    key
-                ] = ChoiceColumnType(f"{Schema._CHOICE_SEQUENCE}{Schema._CHOICE_DELIMITER.join(sorted(choices))}")
-        return Schema(schema=merged_schema)
+        return ChoiceColumnType(f"{Schema._CHOICE_SEQUENCE}{Schema._CHOICE_DELIMITER.join(sorted(choices))}")
 
     @staticmethod
     def _parse_type(value: object) -> ColumnType:
@@ -317,3 +1061,96 @@ class Schema(Generic[DialectColumnType]):
         if value is None:
             return "none"
         return UnsupportedColumnType(f"unsupported:{type(value)}")
+
+
+def _write_string(content: bytearray, string: str):
+    """
+    Appends a string as its UTF-8 bytes, prefixed with their length as a varint.
+    """
+    encoded = string.encode()
+    length = len(encoded)
+    while length >= 0x80:
+        content.append(length & 0x7F | 0x80)
+        length >>= 7
+    content.append(length)
+    content += encoded
+
+
+def _read_string(content: bytes, position: int) -> tuple[str, int]:
+    """
+    Reads a string written by `_write_string`, returns it and the position after it.
+    """
+    length = 0
+    shift = 0
+    while content[position] & 0x80:
+        length |= (content[position] & 0x7F) << shift
+        shift += 7
+        position += 1
+    length |= content[position] << shift
+    position += 1
+    return content[position : position + length].decode(), position + length
+
+
+def _read_lines(infile: BinaryIO, end: int) -> Iterator[bytes]:
+    """
+    Reads the lines of a binary file up to the `end` offset.
+    """
+    position = infile.tell()
+    while position < end:
+        line = infile.readline()
+        if not line:
+            return
+        position += len(line)
+        yield line
+
+
+def _convert_file_range(
+    task: tuple[
+        dict[str, ColumnType],
+        str,
+        int,
+        int,
+        str,
+        str,
+        int,
+        Serializer,
+        bool,
+        str | None,
+        str | None,
+    ]
+) -> int:
+    """
+    Converts a byte range of a newline delimited JSON file. Runs within a worker process for `convert_file`.
+    """
+    (
+        schema,
+        input_path,
+        start,
+        end,
+        output_path,
+        format,
+        batch_size,
+        serializer,
+        write_header,
+        on_mismatch,
+        rejects_path,
+    ) = task
+    with ExitStack() as stack:
+        infile = stack.enter_context(open(input_path, "rb"))
+        output = stack.enter_context(
+            open(output_path, "w", encoding="utf-8", newline="")
+        )
+        rejects = None
+        if rejects_path is not None:
+            rejects = stack.enter_context(open(rejects_path, "w", encoding="utf-8"))
+        infile.seek(start)
+        return Schema(schema).convert_stream(
+            _read_lines(infile, end),
+            output,
+            format,
+            batch_size,
+            serializer,
+            write_header,
+            on_mismatch,
+            rejects,
+        )
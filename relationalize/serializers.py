@@ -0,0 +1,192 @@
+from abc import ABC, abstractmethod
+import json
+import math
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+_CONTAINER_CLASSES = {dict, list, tuple}
+
+# Leaves the types `json` can not encode, EX: datetimes, to the standard library in compatible mode.
+_ORJSON_PASSTHROUGH = (
+    0
+    if orjson is None
+    else orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    | orjson.OPT_PASSTHROUGH_SUBCLASS
+)
+
+
+class Serializer(ABC):
+    """
+    Parent class for the different JSON backends.
+
+    Child classes must implement the `dumps` and `loads` methods.
+    `ignore_nan` encodes NaN and Infinity as `null` instead of the non-standard `NaN`/`Infinity` literals.
+    """
+
+    name: str
+
+    def __init__(self, ignore_nan: bool = False):
+        self.ignore_nan = ignore_nan
+
+    @abstractmethod
+    def dumps(self, content: Any) -> str:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def loads(self, content: str | bytes) -> Any:
+        raise NotImplementedError()
+
+
+class StdlibSerializer(Serializer):
+    """
+    Inherits from `Serializer` and implements it with the standard library `json` module.
+    """
+
+    name = "json"
+
+    def dumps(self, content: Any) -> str:
+        if not self.ignore_nan:
+            return json.dumps(content)
+        try:
+            return json.dumps(content, allow_nan=False)
+        except ValueError:
+            return json.dumps(_replace_nan(content))
+
+    def loads(self, content: str | bytes) -> Any:
+        return json.loads(content)
+
+
+class OrjsonSerializer(Serializer):
+    """
+    Inherits from `Serializer` and implements it with `orjson`.
+
+    orjson always encodes NaN and Infinity as `null`.
+    `compatible` keeps the results of the standard library for JSON content: rows orjson can not encode
+    like `json`, EX: integers beyond 64 bits, NaN unless `ignore_nan`, datetimes, dataclasses and subclasses
+    of the builtin types, are encoded with `json` instead, raising its errors. `loads` uses `json`, which keeps
+    big integers exact and accepts NaN literals. UUIDs and enums are still encoded by orjson.
+    """
+
+    name = "orjson"
+
+    def __init__(self, ignore_nan: bool = False, compatible: bool = False):
+        if orjson is None:
+            raise ImportError("OrjsonSerializer requires the orjson package.")
+        super().__init__(ignore_nan)
+        self.compatible = compatible
+        self._fallback = StdlibSerializer(ignore_nan)
+
+    def dumps(self, content: Any) -> str:
+        if not self.compatible:
+            return orjson.dumps(content).decode()
+        try:
+            encoded = orjson.dumps(content, option=_ORJSON_PASSTHROUGH)
+        except orjson.JSONEncodeError:
+            return self._fallback.dumps(content)
+        if not self.ignore_nan and b"null" in encoded and _has_non_finite(content):
+            return self._fallback.dumps(content)
+        return encoded.decode()
+
+    def loads(self, content: str | bytes) -> Any:
+        if self.compatible:
+            return json.loads(content)
+        return orjson.loads(content)
+
+
+class MsgspecSerializer(Serializer):
+    """
+    Inherits from `Serializer` and implements it with `msgspec`.
+
+    msgspec always encodes NaN and Infinity as `null`.
+    `compatible` behaves as it does for `OrjsonSerializer`, except that msgspec has no pass through:
+    datetimes, dataclasses, UUIDs and enums are still encoded by msgspec.
+    """
+
+    name = "msgspec"
+
+    def __init__(self, ignore_nan: bool = False, compatible: bool = False):
+        if msgspec is None:
+            raise ImportError("MsgspecSerializer requires the msgspec package.")
+        super().__init__(ignore_nan)
+        self.compatible = compatible
+        self._fallback = StdlibSerializer(ignore_nan)
+        self._encode = msgspec.json.Encoder().encode
+        self._decode = msgspec.json.Decoder().decode
+
+    def dumps(self, content: Any) -> str:
+        if not self.compatible:
+            return self._encode(content).decode()
+        try:
+            encoded = self._encode(content)
+        except (msgspec.EncodeError, OverflowError):
+            return self._fallback.dumps(content)
+        if not self.ignore_nan and b"null" in encoded and _has_non_finite(content):
+            return self._fallback.dumps(content)
+        return encoded.decode()
+
+    def loads(self, content: str | bytes) -> Any:
+        if self.compatible:
+            return json.loads(content)
+        return self._decode(content)
+
+
+def get_serializer(backend: str | None = None, ignore_nan: bool = False) -> Serializer:
+    """
+    Creates a serializer for the given backend name (`orjson`, `msgspec` or `json`).
+
+    By default the fastest installed backend is picked for encoding, falling back to the standard library.
+    The default is `compatible`, producing the results of the standard library for JSON content, see `OrjsonSerializer`.
+    Name a backend explicitly to decode with it as well.
+    """
+    if backend is None:
+        if orjson is not None:
+            return OrjsonSerializer(ignore_nan, compatible=True)
+        if msgspec is not None:
+            return MsgspecSerializer(ignore_nan, compatible=True)
+        return StdlibSerializer(ignore_nan)
+    for serializer in (OrjsonSerializer, MsgspecSerializer, StdlibSerializer):
+        if serializer.name == backend:
+            return serializer(ignore_nan)
+    raise ValueError(f"Unknown serializer backend: {backend}")
+
+
+def _has_non_finite(content: Any) -> bool:
+    """
+    Whether the content holds a NaN or Infinity float.
+    Compares classes rather than `isinstance`, as it runs on every row holding a `null`.
+    """
+    for value in content.values() if content.__class__ is dict else content:
+        value_class = value.__class__
+        if value_class is float:
+            # Zero for finite floats, NaN otherwise.
+            if value - value:
+                return True
+        elif value_class in _CONTAINER_CLASSES and _has_non_finite(value):
+            return True
+    return False
+
+
+def _replace_nan(content: Any) -> Any:
+    """
+    Replaces NaN and Infinity floats with None.
+    """
+    if isinstance(content, float):
+        return content if math.isfinite(content) else None
+    if isinstance(content, dict):
+        return {key: _replace_nan(value) for key, value in content.items()}
+    if isinstance(content, list):
+        return [_replace_nan(value) for value in content]
+    return content
+
+
+DEFAULT_SERIALIZER = get_serializer()
@@ -15,10 +15,13 @@ class SQLDialect(ABC, Generic[DialectColumnType]):
 
     Child classes must implement the `generate_ddl_column` method
     , and provide `type_column_mapping` and `base_ddl`.
+    Providing `base_add_column_ddl` and `base_alter_column_type_ddl` enables `generate_alter_ddl`.
     """
 
     type_column_mapping: Mapping[SupportedColumnType, DialectColumnType]
     base_ddl: str
+    base_add_column_ddl: str
+    base_alter_column_type_ddl: str
 
     @staticmethod
     @abstractmethod
@@ -35,6 +38,34 @@ class SQLDialect(ABC, Generic[DialectColumnType]):
             schema=schema, table_name=table_name, columns=columns_str
         )
 
+    def generate_alter_ddl(
+        self,
+        schema: str,
+        table_name: str,
+        add_columns: list[str],
+        alter_columns: list[tuple[str, DialectColumnType]],
+    ) -> list[str]:
+        """
+        Generates an "Alter Table" statement for each column definition to add, given the schema and table_name,
+        and for each existing column, by name, to change to the given type.
+        """
+        statements = [
+            self.base_add_column_ddl.format(
+                schema=schema, table_name=table_name, column=column
+            )
+            for column in add_columns
+        ]
+        for column_name, column_type in alter_columns:
+            statements.append(
+                self.base_alter_column_type_ddl.format(
+                    schema=schema,
+                    table_name=table_name,
+                    column_name=column_name.replace('"', '""'),
+                    column_type=column_type,
+                )
+            )
+        return statements
+
 
 PostgresColumn = Literal[
     'BIGINT',
@@ -64,6 +95,13 @@ CREATE TABLE IF NOT EXISTS "{schema}"."{table_name}" (
 );
     """.strip()
 
+    base_add_column_ddl: str = (
+        'ALTER TABLE "{schema}"."{table_name}" ADD COLUMN {column};'
+    )
+
+    # Only used for columns of `none` type, which hold nothing but nulls.
+    base_alter_column_type_ddl: str = 'ALTER TABLE "{schema}"."{table_name}" ALTER COLUMN "{column_name}" TYPE {column_type} USING NULL;'
+
     @staticmethod
     def generate_ddl_column(column_name: str, column_type: PostgresColumn):
         cleaned_column_name = column_name.replace('"', '""')
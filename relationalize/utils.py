@@ -1,18 +1,40 @@
 import os
-from io import StringIO
+import tempfile
+from io import StringIO, TextIOBase
+from queue import Queue
+from threading import Lock, Thread
+from typing import TextIO
 
+DEFAULT_FILE_BUFFER_SIZE = 1024**2
+DEFAULT_WRITE_BEHIND_QUEUE_SIZE = 64
+DEFAULT_WRITER_POOL_QUEUE_SIZE = 16
+DEFAULT_MEMORY_BUDGET = 256 * 1024**2
 
-def create_local_file(output_dir: str = ""):
+
+def create_local_file(
+    output_dir: str = "",
+    buffer_size: int = DEFAULT_FILE_BUFFER_SIZE,
+    write_behind: bool = False,
+    append: bool = False,
+):
     """
     A `create_output` compatible Callable for utilizing the local File System with relationalize.
+
+    Files are written through a binary buffer of `buffer_size` bytes, 1 makes them line buffered.
+    With `write_behind` the writes are handed to a background thread, see `WriteBehindFile`.
+    With `append` existing files are appended to instead of overwritten, EX: as `reopen_output`.
     """
 
     def open_local_file(identifier: str):
-        return open(
+        local_file = open(
             f"{os.path.join(output_dir, identifier)}.json",
-            "w",
-            buffering=1,
+            "a" if append else "w",
+            buffering=buffer_size,
+            encoding="utf-8",
         )
+        if write_behind:
+            return WriteBehindFile(local_file)
+        return local_file
 
     return open_local_file
 
@@ -28,6 +50,275 @@ def create_local_buffer():
     return open_local_buffer
 
 
+def create_spilling_buffer(
+    memory_budget: int = DEFAULT_MEMORY_BUDGET, spill_dir: str | None = None
+):
+    """
+    A `create_output` compatible Callable that creates in memory buffers which spill to disk.
+
+    All buffers created by the returned Callable share a budget of `memory_budget` characters.
+    Once it is exceeded, the largest in memory buffers are moved to temporary files in `spill_dir`
+    (the system default when None) until the rest fits again. See `SpillingBuffer`.
+    """
+    budget = MemoryBudget(memory_budget, spill_dir)
+
+    def open_spilling_buffer(identifier: str):
+        return SpillingBuffer(budget)
+
+    return open_spilling_buffer
+
+
+class MemoryBudget:
+    """
+    The memory budget, in characters, shared by a group of `SpillingBuffer`s.
+    """
+
+    def __init__(self, limit: int, spill_dir: str | None = None):
+        self.limit = limit
+        self.spill_dir = spill_dir
+        self.used = 0
+        self.lock = Lock()
+        self._buffers: set["SpillingBuffer"] = set()
+
+    def add(self, buffer: "SpillingBuffer", size: int):
+        """
+        Accounts for `size` more characters held by `buffer`, spilling the largest buffers while over budget.
+        """
+        self._buffers.add(buffer)
+        self.used += size
+        while self.used > self.limit and self._buffers:
+            largest_buffer = max(self._buffers, key=lambda buffer: buffer.size)
+            largest_buffer.spill()
+
+    def release(self, buffer: "SpillingBuffer"):
+        """
+        Removes a buffer which no longer holds memory from the budget.
+        """
+        if buffer in self._buffers:
+            self._buffers.remove(buffer)
+            self.used -= buffer.size
+
+
+class SpillingBuffer(TextIOBase):
+    """
+    A TextIO which is kept in memory until its `MemoryBudget` spills it to a temporary file.
+
+    Reading, seeking and writing work the same before and after spilling,
+    `getvalue` returns the whole content like `StringIO.getvalue`, positions returned by `tell`
+    before spilling are the only thing that does not carry over. The temporary file is deleted once the buffer is closed.
+    """
+
+    def __init__(self, budget: MemoryBudget):
+        self.budget = budget
+        self.size = 0
+        self.spilled = False
+        self._buffer: TextIO = StringIO()
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        with self.budget.lock:
+            written = self._buffer.write(s)
+            if not self.spilled:
+                self.size += len(s)
+                self.budget.add(self, len(s))
+        return written
+
+    def read(self, size: int | None = -1) -> str:
+        with self.budget.lock:
+            return self._buffer.read(size)
+
+    def readline(self, size: int | None = -1) -> str:
+        with self.budget.lock:
+            return self._buffer.readline(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        with self.budget.lock:
+            return self._buffer.seek(offset, whence)
+
+    def tell(self) -> int:
+        with self.budget.lock:
+            return self._buffer.tell()
+
+    def getvalue(self) -> str:
+        with self.budget.lock:
+            if not self.spilled:
+                return self._buffer.getvalue()
+            position = self._buffer.tell()
+            self._buffer.seek(0)
+            value = self._buffer.read()
+            self._buffer.seek(position)
+            return value
+
+    def spill(self):
+        """
+        Moves the content to a temporary file, keeping the current position. Called by the budget.
+        """
+        if self.spilled:
+            return
+        value = self._buffer.getvalue()
+        position = self._buffer.tell()
+        spill_file = tempfile.TemporaryFile(
+            "w+", encoding="utf-8", dir=self.budget.spill_dir
+        )
+        spill_file.write(value[:position])
+        # Text file positions are opaque cookies rather than character offsets.
+        spill_position = spill_file.tell()
+        spill_file.write(value[position:])
+        spill_file.seek(spill_position)
+        self.budget.release(self)
+        self._buffer = spill_file
+        self.spilled = True
+        self.size = 0
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        with self.budget.lock:
+            self.budget.release(self)
+            self._buffer.close()
+        super().close()
+
+
+class WriteBehindFile(TextIOBase):
+    """
+    A write-only TextIO which hands writes to a background thread writing them to the wrapped file.
+
+    At most `queue_size` writes are pending, after that `write` blocks until the thread catches up.
+    `flush` and `close` wait for all pending writes and raise any error the thread encountered.
+    """
+
+    def __init__(self, file: TextIO, queue_size: int = DEFAULT_WRITE_BEHIND_QUEUE_SIZE):
+        self.file = file
+        self._queue: Queue[str | None] = Queue(maxsize=queue_size)
+        self._error: BaseException | None = None
+        self._thread = Thread(target=self._write_pending, daemon=True)
+        self._thread.start()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        self._raise_error()
+        self._queue.put(s)
+        return len(s)
+
+    def flush(self) -> None:
+        self._queue.join()
+        self._raise_error()
+        self.file.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            # Flushes the pending writes before marking this file as closed.
+            super().close()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            self.file.close()
+
+    def _write_pending(self):
+        while True:
+            s = self._queue.get()
+            try:
+                if s is None:
+                    return
+                if self._error is None:
+                    self.file.write(s)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+
+class WriterPool:
+    """
+    A pool of writer threads which writes to outputs in the background.
+
+    Each output is assigned to a single thread, so the writes to an output keep their order.
+    Every thread has a queue of at most `queue_size` pending writes, after that `submit` blocks.
+    `join` waits for all pending writes and raises the first error a thread encountered.
+    """
+
+    def __init__(self, workers: int, queue_size: int = DEFAULT_WRITER_POOL_QUEUE_SIZE):
+        self._queues: list[Queue[tuple[TextIO, str] | None]] = [
+            Queue(maxsize=queue_size) for _ in range(workers)
+        ]
+        self._assignments: dict[str, Queue[tuple[TextIO, str] | None]] = {}
+        self._error: BaseException | None = None
+        self._closed = False
+        self._threads = [
+            Thread(target=self._write_pending, args=(queue,), daemon=True)
+            for queue in self._queues
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key: str, output: TextIO, s: str):
+        """
+        Queues a write of `s` to the output identified by `key`.
+        """
+        self._raise_error()
+        if key not in self._assignments:
+            self._assignments[key] = self._queues[
+                len(self._assignments) % len(self._queues)
+            ]
+        self._assignments[key].put((output, s))
+
+    def join(self):
+        """
+        Waits for all pending writes.
+        """
+        for queue in self._queues:
+            queue.join()
+        self._raise_error()
+
+    def close(self):
+        """
+        Stops the threads once their pending writes are done. Errors are raised by `join`.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for queue in self._queues:
+            queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _write_pending(self, queue: Queue[tuple[TextIO, str] | None]):
+        while True:
+            pending_write = queue.get()
+            try:
+                if pending_write is None:
+                    return
+                if self._error is None:
+                    output, s = pending_write
+                    output.write(s)
+            except BaseException as error:
+                self._error = error
+            finally:
+                queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+
 def no_op(schema: str, object: dict[str, object]) -> None:
     """
     Does nothing.
@@ -0,0 +1,166 @@
+import asyncio
+from io import StringIO
+import json
+import re
+import unittest
+
+from setup_tests import setup_tests
+
+setup_tests()
+
+from relationalize import AsyncRelationalize, Relationalize
+from relationalize.utils import create_local_buffer
+
+CASE_1 = {"1": 1, "2": "foobar", "3": False, "4": 1.2}
+
+CASE_2 = {
+    "1": [{"2": "foobar", "3": [1, 2]}, {"2": "barfoo", "3": [3, 4]}],
+    "2": "foobar",
+}
+
+CASE_3 = {"1": [[{"2": 3}, {"2": 4}], [{"2": 5}, {"2": 6}]], "4": {"5": [1]}}
+
+RID_PATTERN = re.compile(r"R_[a-z0-9]{32}")
+
+
+class AsyncBuffer:
+    """
+    An in memory async output, which yields to the event loop on every write.
+    """
+
+    def __init__(self):
+        self.buffer = StringIO()
+        self.closed = False
+
+    async def write(self, s: str) -> int:
+        await asyncio.sleep(0)
+        return self.buffer.write(s)
+
+    async def close(self):
+        self.closed = True
+
+
+class FailingAsyncBuffer(AsyncBuffer):
+    async def write(self, s: str) -> int:
+        raise OSError("connection reset")
+
+
+def create_documents():
+    return [json.loads(json.dumps(case)) for case in (CASE_1, CASE_2, CASE_3) * 40]
+
+
+async def create_async_documents():
+    for document in create_documents():
+        await asyncio.sleep(0)
+        yield document
+
+
+def sync_outputs() -> dict[str, str]:
+    with Relationalize("test", create_local_buffer()) as r:
+        r.relationalize(create_documents())
+        contents: dict[str, str] = {}
+        for identifier, output in r.outputs.items():
+            output.seek(0)
+            contents[identifier] = RID_PATTERN.sub("RID", output.read())
+    return contents
+
+
+async def async_outputs(documents, **kwargs) -> dict[str, str]:
+    outputs: dict[str, AsyncBuffer] = {}
+
+    async def create_async_buffer(identifier: str):
+        await asyncio.sleep(0)
+        outputs[identifier] = AsyncBuffer()
+        return outputs[identifier]
+
+    async with AsyncRelationalize("test", create_async_buffer, **kwargs) as r:
+        await r.relationalize(documents)
+    assert all(output.closed for output in outputs.values())
+    return {
+        identifier: RID_PATTERN.sub("RID", output.buffer.getvalue())
+        for identifier, output in outputs.items()
+    }
+
+
+class AsyncRelationalizeTest(unittest.TestCase):
+    def test_matches_relationalize(self):
+        expected = sync_outputs()
+        self.assertDictEqual(
+            expected, asyncio.run(async_outputs(create_async_documents()))
+        )
+        self.assertDictEqual(expected, asyncio.run(async_outputs(create_documents())))
+        self.assertDictEqual(
+            expected,
+            asyncio.run(
+                async_outputs(
+                    create_async_documents(), batch_size=3, max_pending_writes=2
+                )
+            ),
+        )
+        self.assertDictEqual(
+            expected,
+            asyncio.run(
+                async_outputs(create_async_documents(), batch_size=1, plan_cache_size=8)
+            ),
+        )
+
+    def test_infer_schemas(self):
+        with Relationalize("test", create_local_buffer(), infer_schemas=True) as r:
+            r.relationalize(create_documents())
+            expected = {
+                identifier: list(schema.schema.items())
+                for identifier, schema in r.schemas.items()
+            }
+
+        async def relationalize(plan_cache_size: int):
+            async with AsyncRelationalize(
+                "test",
+                create_async_buffer,
+                infer_schemas=True,
+                plan_cache_size=plan_cache_size,
+            ) as r:
+                await r.relationalize(create_async_documents())
+            return {
+                identifier: list(schema.schema.items())
+                for identifier, schema in r.schemas.items()
+            }
+
+        async def create_async_buffer(identifier: str):
+            return AsyncBuffer()
+
+        self.assertIn("test", expected)
+        for plan_cache_size in (0, 8):
+            self.assertDictEqual(expected, asyncio.run(relationalize(plan_cache_size)))
+
+    def test_write_error(self):
+        async def create_failing_buffer(identifier: str):
+            return FailingAsyncBuffer()
+
+        async def relationalize():
+            r = AsyncRelationalize("test", create_failing_buffer)
+            with self.assertRaises(OSError):
+                await r.relationalize(create_async_documents())
+            with self.assertRaises(OSError):
+                await r.close_io()
+            self.assertTrue(all(output.closed for output in r.outputs.values()))
+
+        asyncio.run(relationalize())
+
+    def test_io_workers(self):
+        async def create_async_buffer(identifier: str):
+            return AsyncBuffer()
+
+        with self.assertRaises(ValueError):
+            AsyncRelationalize("test", create_async_buffer, io_workers=2)
+
+    def test_sync_context_manager(self):
+        async def create_async_buffer(identifier: str):
+            return AsyncBuffer()
+
+        with self.assertRaises(TypeError):
+            with AsyncRelationalize("test", create_async_buffer):
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import unittest
+
+from setup_tests import setup_tests
+
+setup_tests()
+
+from relationalize import Relationalize, Schema
+from relationalize.memory_store import MemoryStore
+from relationalize.rids import sequential_rids
+
+CASE_1 = {"1": [{"2": "foobar", "3": 1}, {"2": 2, "4": None}], "5": "foobar"}
+
+CASE_2 = {"5": None, "1": [{"3": 1.5}], "6": True}
+
+
+class MemoryStoreTest(unittest.TestCase):
+    def test_add_rows(self):
+        r = Relationalize("test_case_1", rid_generator=sequential_rids("test"))
+        rows = list(
+            r.iter_rows(json.loads(json.dumps(case)) for case in [CASE_1, CASE_2])
+        )
+        store = MemoryStore()
+        store.add_rows(rows)
+
+        self.assertEqual(["test_case_1_1", "test_case_1"], list(store.rows))
+        self.assertEqual(3, store.row_count("test_case_1_1"))
+        self.assertEqual(0, store.row_count("test_case_2"))
+        self.assertEqual(
+            ["1_2", "1_3", "1__rid_", "1__index_", "1_4"],
+            store.columns["test_case_1_1"],
+        )
+        for identifier in store.rows:
+            self.assertEqual(
+                [row for row_identifier, row in rows if row_identifier == identifier],
+                list(store.iter_rows(identifier)),
+            )
+            for values in store.rows[identifier]:
+                self.assertIsInstance(values, tuple)
+
+    def test_convert_rows(self):
+        r = Relationalize(
+            "test_case_2", rid_generator=sequential_rids("test"), infer_schemas=True
+        )
+        store = MemoryStore()
+        store.add_rows(
+            r.iter_rows(json.loads(json.dumps(case)) for case in [CASE_1, CASE_2])
+        )
+        schema: Schema = r.schemas["test_case_2_1"]
+        self.assertEqual(
+            [
+                {
+                    "1__rid_": "R_test_0",
+                    "1__index_": 0,
+                    "1_2_str": "foobar",
+                    "1_3_int": 1,
+                },
+                {"1__rid_": "R_test_0", "1__index_": 1, "1_2_int": 2, "1_4": None},
+                {"1__rid_": "R_test_1", "1__index_": 0, "1_3_float": 1.5},
+            ],
+            list(store.convert_rows("test_case_2_1", schema)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
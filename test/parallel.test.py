@@ -0,0 +1,202 @@
+import json
+import os
+import tempfile
+import unittest
+
+from setup_tests import setup_tests
+
+setup_tests()
+
+from relationalize import Relationalize, Schema, merge_schemas, parallel_relationalize
+from relationalize.parallel import ByteRange, read_ndjson_range, split_ndjson
+from relationalize.rids import integer_rids
+from relationalize.utils import create_local_buffer
+
+SHARDS = [
+    [
+        {"1": 1, "2": "foobar", "3": [1, 2]},
+        {"1": 2, "2": "barfoo", "3": [{"4": True}]},
+    ],
+    [
+        {"1": "foobar", "2": None, "3": []},
+        {"1": 3, "5": {"6": 1.5}},
+    ],
+    [
+        {"1": 4, "2": "foobar", "3": ["foobar", 5]},
+        # An array which is empty in every document has no table.
+        {"1": 5, "7": []},
+    ],
+]
+
+
+def write_shards(input_dir: str) -> list[str]:
+    paths: list[str] = []
+    for index, shard in enumerate(SHARDS):
+        path = os.path.join(input_dir, f"shard_{index}.json")
+        with open(path, "w") as shard_file:
+            for document in shard:
+                shard_file.write(f"{json.dumps(document)}\n")
+        paths.append(path)
+    return paths
+
+
+def write_single_file(input_dir: str, trailing_newline: bool = True) -> str:
+    path = os.path.join(input_dir, "single.json")
+    documents = [document for shard in SHARDS for document in shard] * 20
+    with open(path, "w") as single_file:
+        single_file.write("\n".join(json.dumps(document) for document in documents))
+        if trailing_newline:
+            single_file.write("\n")
+    return path
+
+
+def sequential_schemas() -> dict[str, Schema]:
+    schemas: dict[str, Schema] = {}
+
+    def on_object_write(identifier: str, object: dict):
+        if identifier not in schemas:
+            schemas[identifier] = Schema()
+        schemas[identifier].read_object(object)
+
+    with Relationalize("test", create_local_buffer(), on_object_write) as r:
+        r.relationalize(document for shard in SHARDS for document in shard)
+    return schemas
+
+
+def read_rows(paths: list[str]) -> list[dict]:
+    rows: list[dict] = []
+    for path in paths:
+        with open(path) as output:
+            rows.extend(json.loads(line) for line in output)
+    return rows
+
+
+class ParallelTest(unittest.TestCase):
+    def test_parallel_relationalize(self):
+        expected_schemas = sequential_schemas()
+        for workers in (1, 2):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                schemas, output_locations = parallel_relationalize(
+                    write_shards(temp_dir),
+                    "test",
+                    output_dir=os.path.join(temp_dir, "output"),
+                    workers=workers,
+                    # Overridden, the shard schemas are always inferred.
+                    infer_schemas=False,
+                )
+                self.assertListEqual(
+                    sorted(expected_schemas), sorted(schemas), f"workers={workers}"
+                )
+                for identifier, schema in expected_schemas.items():
+                    self.assertDictEqual(schema.schema, schemas[identifier].schema)
+
+                self.assertListEqual(
+                    [
+                        os.path.join(
+                            temp_dir, "output", "test", f"part-0000{index}.json"
+                        )
+                        for index in range(3)
+                    ],
+                    sorted(output_locations["test"]),
+                )
+                self.assertListEqual(sorted(schemas), sorted(output_locations))
+                self.assertEqual(6, len(read_rows(output_locations["test"])))
+                self.assertEqual(5, len(read_rows(output_locations["test_3"])))
+
+    def test_split_ndjson(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for trailing_newline in (True, False):
+                path = write_single_file(temp_dir, trailing_newline)
+                with open(path) as single_file:
+                    expected = [json.loads(line) for line in single_file]
+                size = os.path.getsize(path)
+
+                for parts in (1, 2, 3, 7, 50, 1000):
+                    byte_ranges = split_ndjson(path, parts)
+                    self.assertLessEqual(len(byte_ranges), parts)
+                    self.assertEqual(0, byte_ranges[0].start)
+                    self.assertEqual(size, byte_ranges[-1].end)
+                    for previous, byte_range in zip(byte_ranges, byte_ranges[1:]):
+                        self.assertEqual(previous.end, byte_range.start)
+                    for use_mmap in (True, False):
+                        self.assertListEqual(
+                            expected,
+                            [
+                                document
+                                for byte_range in byte_ranges
+                                for document in read_ndjson_range(byte_range, use_mmap)
+                            ],
+                        )
+
+            empty_path = os.path.join(temp_dir, "empty.json")
+            open(empty_path, "w").close()
+            self.assertListEqual([], split_ndjson(empty_path, 4))
+
+    def test_parallel_relationalize_byte_ranges(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = write_single_file(temp_dir)
+            byte_ranges = split_ndjson(path, 4)
+            self.assertIsInstance(byte_ranges[0], ByteRange)
+            schemas, output_locations = parallel_relationalize(
+                byte_ranges,
+                "test",
+                output_dir=temp_dir,
+                workers=2,
+                rid_generator_factory=integer_rids,
+            )
+            rows = read_rows(output_locations["test"])
+            sub_rows = read_rows(output_locations["test_3"])
+
+        for identifier, schema in sequential_schemas().items():
+            self.assertEqual(schema.schema.keys(), schemas[identifier].schema.keys())
+        self.assertEqual(120, len(rows))
+        self.assertEqual(100, len(sub_rows))
+        rids = [row["3"] for row in rows if "3" in row]
+        self.assertEqual(len(rids), len(set(rids)))
+
+    def test_parallel_relationalize_rid_generator_factory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            schemas, output_locations = parallel_relationalize(
+                write_shards(temp_dir),
+                "test",
+                output_dir=temp_dir,
+                workers=2,
+                rid_generator_factory=integer_rids,
+            )
+            rows = read_rows(output_locations["test"])
+            sub_rows = read_rows(output_locations["test_3"])
+
+        self.assertEqual("int", schemas["test"].schema["3"])
+        rids = [row["3"] for row in rows if "3" in row]
+        self.assertEqual(len(rids), len(set(rids)))
+        self.assertEqual(4, len(rids))
+        self.assertSetEqual({rid >> 40 for rid in rids}, {0, 1, 2})
+        self.assertTrue({row["3__rid_"] for row in sub_rows} <= set(rids))
+
+    def test_merge_schemas(self):
+        schemas: list[Schema | dict[str, str]] = []
+        for index in range(50):
+            schema = Schema()
+            schema.read_object(
+                {
+                    str(index % 7): [index, str(index), None, 1.5][index % 4],
+                    "common": [1, True][index % 2],
+                }
+            )
+            schemas.append(schema if index % 2 else schema.schema)
+        schemas.append({"unsupported": "unsupported:<class 'list'>"})
+        expected = Schema.merge(*schemas)
+
+        for workers in (1, 2):
+            merged_schema = merge_schemas(schemas, workers=workers, chunk_size=3)
+            self.assertEqual(
+                list(expected.schema.items()), list(merged_schema.schema.items())
+            )
+        self.assertDictEqual({}, merge_schemas([]).schema)
+        for chunk_size in (0, 1):
+            with self.assertRaises(ValueError):
+                merge_schemas(schemas[:3], workers=2, chunk_size=chunk_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,17 @@
+from io import StringIO
+from itertools import islice, repeat
 import json
+import re
 import unittest
 
 from setup_tests import setup_tests
 
 setup_tests()
 
-from relationalize import Relationalize
+from relationalize import Relationalize, Schema
+from relationalize import rids
+from relationalize.rids import content_hash_rids, integer_rids, sequential_rids
+from relationalize.serializers import StdlibSerializer
 from relationalize.utils import create_local_buffer
 
 CASE_1 = {"1": 1, "2": "foobar", "3": False, "4": 1.2}
@@ -27,10 +33,70 @@ CASE_7 = {"1": {"2": 1, "3": "foobar"}}
 
 CASE_8 = {"1": [[{"2": 3}, {"2": 4}], [{"2": 5}, {"2": 6}]]}
 
+CASE_9_DEPTH = 5000
+
+ALL_CASES = [CASE_1, CASE_2, CASE_3, CASE_4, CASE_5, CASE_6, CASE_7, CASE_8]
+
+# Pins the output formatting these tests compare against to `json.dumps`.
+STDLIB_SERIALIZER = StdlibSerializer()
+
+RID_PATTERN = re.compile(r"R_[a-z0-9]{32}")
+
+
+class CountingBuffer(StringIO):
+    """
+    An in memory buffer counting the calls to `write`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.write_count = 0
+
+    def write(self, s: str) -> int:
+        self.write_count += 1
+        return super().write(s)
+
+
+class FailingBuffer(StringIO):
+    """
+    An in memory buffer failing every call to `write`.
+    """
+
+    def write(self, s: str) -> int:
+        raise OSError("disk full")
+
+
+class PartBuffer(StringIO):
+    """
+    An in memory buffer which appends its content to a list of parts once closed.
+    """
+
+    def __init__(self, parts: list[str]):
+        super().__init__()
+        self.parts = parts
+
+    def close(self):
+        if not self.closed:
+            self.parts.append(self.getvalue())
+        super().close()
+
+
+def read_outputs(r: Relationalize) -> dict[str, str]:
+    """
+    Reads every output buffer, masking the randomly generated RIDs.
+    """
+    contents: dict[str, str] = {}
+    for identifier, output in r.outputs.items():
+        output.seek(0)
+        contents[identifier] = RID_PATTERN.sub("RID", output.read())
+    return contents
+
 
 class RelationalizeTest(unittest.TestCase):
     def test_no_array(self):
-        with Relationalize("test_case_1", create_local_buffer()) as r:
+        with Relationalize(
+            "test_case_1", create_local_buffer(), serializer=STDLIB_SERIALIZER
+        ) as r:
             r.relationalize([CASE_1])
             self.assertListEqual(["test_case_1"], list(r.outputs.keys()))
             r.outputs["test_case_1"].seek(0)
@@ -40,7 +106,9 @@ class RelationalizeTest(unittest.TestCase):
             )
 
     def test_two_records_no_array(self):
-        with Relationalize("test_case_2", create_local_buffer()) as r:
+        with Relationalize(
+            "test_case_2", create_local_buffer(), serializer=STDLIB_SERIALIZER
+        ) as r:
             r.relationalize([CASE_1, CASE_2])
             self.assertListEqual(["test_case_2"], list(r.outputs.keys()))
             r.outputs["test_case_2"].seek(0)
@@ -50,7 +118,9 @@ class RelationalizeTest(unittest.TestCase):
             )
 
     def test_literal_array(self):
-        with Relationalize("test_case_3", create_local_buffer()) as r:
+        with Relationalize(
+            "test_case_3", create_local_buffer(), serializer=STDLIB_SERIALIZER
+        ) as r:
             r.relationalize([CASE_3])
             self.assertListEqual(
                 sorted(["test_case_3", "test_case_3_1"]), sorted(list(r.outputs.keys()))
@@ -73,7 +143,9 @@ class RelationalizeTest(unittest.TestCase):
             )
 
     def test_struct_array(self):
-        with Relationalize("test_case_4", create_local_buffer()) as r:
+        with Relationalize(
+            "test_case_4", create_local_buffer(), serializer=STDLIB_SERIALIZER
+        ) as r:
             r.relationalize([CASE_4])
             self.assertListEqual(
                 sorted(["test_case_4", "test_case_4_1"]), sorted(list(r.outputs.keys()))
@@ -109,7 +181,9 @@ class RelationalizeTest(unittest.TestCase):
         )
 
     def test_list_list_literal(self):
-        with Relationalize("test_case_5", create_local_buffer()) as r:
+        with Relationalize(
+            "test_case_5", create_local_buffer(), serializer=STDLIB_SERIALIZER
+        ) as r:
             r.relationalize([CASE_5])
 
             self.assertListEqual(
@@ -184,7 +258,9 @@ class RelationalizeTest(unittest.TestCase):
             )
 
     def test_nested_array_struct_array(self):
-        with Relationalize("test_case_6", create_local_buffer()) as r:
+        with Relationalize(
+            "test_case_6", create_local_buffer(), serializer=STDLIB_SERIALIZER
+        ) as r:
             r.relationalize([CASE_6])
             self.assertListEqual(
                 sorted(["test_case_6", "test_case_6_1", "test_case_6_1_3"]),
@@ -274,7 +350,9 @@ class RelationalizeTest(unittest.TestCase):
             )
 
     def test_list_list_struct(self):
-        with Relationalize("test_case_8", create_local_buffer()) as r:
+        with Relationalize(
+            "test_case_8", create_local_buffer(), serializer=STDLIB_SERIALIZER
+        ) as r:
             r.relationalize([CASE_8])
 
             self.assertListEqual(
@@ -371,6 +449,489 @@ class RelationalizeTest(unittest.TestCase):
                 json.loads(test_case_8_1__val_list[3])["1__val___index_"], 1
             )
 
+    def test_deeply_nested_struct(self):
+        case_9: dict = {"3": "foobar"}
+        for _ in range(CASE_9_DEPTH):
+            case_9 = {"1": 1, "2": case_9}
+
+        with Relationalize("test_case_9", create_local_buffer()) as r:
+            r.relationalize([case_9])
+            self.assertListEqual(["test_case_9"], list(r.outputs.keys()))
+            r.outputs["test_case_9"].seek(0)
+            row = json.loads(r.outputs["test_case_9"].read())
+
+        self.assertEqual(CASE_9_DEPTH + 1, len(row))
+        self.assertEqual(1, row["1"])
+        self.assertEqual(1, row["2_1"])
+        self.assertEqual("foobar", row[f"{'2_' * CASE_9_DEPTH}3"])
+        self.assertEqual(f"{'2_' * CASE_9_DEPTH}3", list(row.keys())[-1])
+
+    def test_plan_cache_matches_traversal(self):
+        with Relationalize("test_case_10", create_local_buffer()) as r:
+            r.relationalize(json.loads(json.dumps(case)) for case in ALL_CASES * 2)
+            expected = read_outputs(r)
+
+        with Relationalize(
+            "test_case_10", create_local_buffer(), plan_cache_size=16
+        ) as r:
+            r.relationalize(json.loads(json.dumps(case)) for case in ALL_CASES * 2)
+            self.assertDictEqual(expected, read_outputs(r))
+
+            cache_info = r.plan_cache_info()
+            self.assertIsNotNone(cache_info)
+            self.assertGreater(cache_info.hits, 0)
+            self.assertEqual(cache_info.misses, cache_info.currsize)
+
+    def test_plan_cache_eviction(self):
+        with Relationalize(
+            "test_case_11", create_local_buffer(), plan_cache_size=1
+        ) as r:
+            r.relationalize([CASE_1, CASE_7, CASE_1])
+            cache_info = r.plan_cache_info()
+            self.assertEqual(0, cache_info.hits)
+            self.assertEqual(3, cache_info.misses)
+            self.assertEqual(1, cache_info.currsize)
+
+        with Relationalize("test_case_11", create_local_buffer()) as r:
+            self.assertIsNone(r.plan_cache_info())
+
+    def test_sequential_rids(self):
+        with Relationalize(
+            "test_case_12",
+            create_local_buffer(),
+            rid_generator=sequential_rids("shard0"),
+        ) as r:
+            r.relationalize(json.loads(json.dumps(case)) for case in (CASE_6, CASE_3))
+            r.outputs["test_case_12"].seek(0)
+            r.outputs["test_case_12_1"].seek(0)
+            rows = [json.loads(line) for line in r.outputs["test_case_12"]]
+            sub_rows = [json.loads(line) for line in r.outputs["test_case_12_1"]]
+
+        self.assertEqual("R_shard0_0", rows[0]["1"])
+        self.assertEqual("R_shard0_3", rows[1]["1"])
+        self.assertListEqual(
+            ["R_shard0_0", "R_shard0_0", "R_shard0_3", "R_shard0_3"],
+            [row["1__rid_"] for row in sub_rows],
+        )
+        self.assertListEqual(
+            ["R_shard0_1", "R_shard0_2"], [row["1_3"] for row in sub_rows[:2]]
+        )
+
+    def test_sequential_rids_random_prefix(self):
+        generate_rid_1 = sequential_rids()
+        generate_rid_2 = sequential_rids()
+        self.assertRegex(generate_rid_1("", []), r"^R_[a-f0-9]{16}_0$")
+        self.assertNotEqual(generate_rid_1("", []), generate_rid_2("", []))
+
+    def test_integer_rids(self):
+        with Relationalize(
+            "test_case_13", create_local_buffer(), rid_generator=integer_rids(3)
+        ) as r:
+            r.relationalize([CASE_4])
+            r.outputs["test_case_13"].seek(0)
+            r.outputs["test_case_13_1"].seek(0)
+            row = json.loads(r.outputs["test_case_13"].read())
+            sub_rows = [json.loads(line) for line in r.outputs["test_case_13_1"]]
+
+        self.assertEqual(3 << 40, row["1"])
+        self.assertTrue(all(sub_row["1__rid_"] == 3 << 40 for sub_row in sub_rows))
+
+        self.assertNotEqual(integer_rids(1)("", []), integer_rids(2)("", []))
+        self.assertLess(integer_rids(2**23 - 1)("", []), 2**63)
+        with self.assertRaises(ValueError):
+            integer_rids(2**23)
+        with self.assertRaises(TypeError):
+            integer_rids()
+
+        counter_bits = rids._COUNTER_BITS
+        rids._COUNTER_BITS = 2
+        try:
+            generate_rid = integer_rids(1)
+            self.assertEqual([4, 5, 6, 7], [generate_rid("", []) for _ in range(4)])
+            with self.assertRaises(OverflowError):
+                generate_rid("", [])
+        finally:
+            rids._COUNTER_BITS = counter_bits
+
+    def test_content_hash_rids(self):
+        generate_rid = content_hash_rids()
+        self.assertRegex(generate_rid("1", [1, 2]), r"^R_[a-f0-9]{32}$")
+        self.assertEqual(generate_rid("1", [1, 2]), content_hash_rids()("1", [1, 2]))
+        self.assertEqual(
+            generate_rid("1", [{"a": 1, "b": 2}]), generate_rid("1", [{"b": 2, "a": 1}])
+        )
+        self.assertNotEqual(generate_rid("1", [1, 2]), generate_rid("1", [2, 1]))
+        self.assertNotEqual(generate_rid("1", [1, 2]), generate_rid("2", [1, 2]))
+
+        generate_unsalted_rid = content_hash_rids(salt_with_path=False)
+        self.assertEqual(
+            generate_unsalted_rid("1", [1, 2]), generate_unsalted_rid("2", [1, 2])
+        )
+
+    def test_deduplicate_arrays(self):
+        with Relationalize(
+            "test_case_14",
+            create_local_buffer(),
+            rid_generator=content_hash_rids(),
+            deduplicate_arrays=True,
+        ) as r:
+            r.relationalize(
+                json.loads(json.dumps(case)) for case in (CASE_6, CASE_6, CASE_3)
+            )
+            r.outputs["test_case_14"].seek(0)
+            r.outputs["test_case_14_1"].seek(0)
+            r.outputs["test_case_14_1_3"].seek(0)
+            rows = [json.loads(line) for line in r.outputs["test_case_14"]]
+            sub_rows = [json.loads(line) for line in r.outputs["test_case_14_1"]]
+            sub_sub_rows = [json.loads(line) for line in r.outputs["test_case_14_1_3"]]
+
+        self.assertEqual(3, len(rows))
+        self.assertEqual(rows[0]["1"], rows[1]["1"])
+        self.assertNotEqual(rows[0]["1"], rows[2]["1"])
+        # CASE_6 is written once, CASE_3 adds its own two rows.
+        self.assertEqual(4, len(sub_rows))
+        self.assertEqual(4, len(sub_sub_rows))
+        self.assertEqual(
+            [rows[0]["1"], rows[0]["1"], rows[2]["1"], rows[2]["1"]],
+            [row["1__rid_"] for row in sub_rows],
+        )
+
+    def test_deduplicate_reused_objects(self):
+        document = {"1": [{"2": 1}, {"2": 2}], "3": [[{"4": 1}]]}
+        r = Relationalize(
+            "test_case_14",
+            create_local_buffer(),
+            rid_generator=content_hash_rids(),
+            deduplicate_arrays=True,
+        )
+        rows = list(r.iter_rows([document, document]))
+        self.assertDictEqual({"1": [{"2": 1}, {"2": 2}], "3": [[{"4": 1}]]}, document)
+        self.assertDictEqual(rows[4][1], rows[5][1])
+        # Every array of the second pass was written by the first.
+        self.assertEqual(
+            [
+                "test_case_14_1",
+                "test_case_14_1",
+                "test_case_14_3__val_",
+                "test_case_14_3",
+                "test_case_14",
+                "test_case_14",
+            ],
+            [identifier for identifier, _ in rows],
+        )
+
+    def test_deduplicate_arrays_bounded(self):
+        with self.assertRaises(ValueError):
+            Relationalize("test_case_14", deduplicate_arrays=True)
+        with self.assertRaises(ValueError):
+            Relationalize(
+                "test_case_14",
+                rid_generator=sequential_rids(),
+                deduplicate_arrays=True,
+            )
+        with self.assertRaises(ValueError):
+            Relationalize(
+                "test_case_14",
+                rid_generator=content_hash_rids(),
+                deduplicate_arrays=True,
+                max_deduplicated_arrays=0,
+            )
+
+        r = Relationalize(
+            "test_case_14",
+            create_local_buffer(),
+            rid_generator=content_hash_rids(),
+            deduplicate_arrays=True,
+            max_deduplicated_arrays=2,
+        )
+        documents = [{"1": [value]} for value in (1, 2, 1, 3, 1, 2)]
+        sub_rows = [
+            row["1__val_"]
+            for identifier, row in r.iter_rows(documents)
+            if identifier == "test_case_14_1"
+        ]
+        # 1 is kept while it is seen again, 2 is evicted by 3.
+        self.assertEqual([1, 2, 3, 2], sub_rows)
+        self.assertEqual(2, len(r._written_rids))
+
+    def test_batched_writes(self):
+        outputs: dict[str, CountingBuffer] = {}
+
+        def create_counting_buffer(identifier: str):
+            outputs[identifier] = CountingBuffer()
+            return outputs[identifier]
+
+        with Relationalize(
+            "test_case_15",
+            create_counting_buffer,
+            batch_size=3,
+            serializer=STDLIB_SERIALIZER,
+        ) as r:
+            r.relationalize([CASE_1, CASE_2] * 4)
+            self.assertEqual(3, outputs["test_case_15"].write_count)
+            outputs["test_case_15"].seek(0)
+            self.assertEqual(
+                f"{json.dumps(CASE_1)}\n{json.dumps(CASE_2)}\n" * 4,
+                outputs["test_case_15"].read(),
+            )
+
+        with Relationalize("test_case_15", create_counting_buffer, batch_bytes=1) as r:
+            r.relationalize([CASE_1, CASE_2] * 4)
+            self.assertEqual(8, outputs["test_case_15"].write_count)
+
+    def test_flush_on_close(self):
+        output = CountingBuffer()
+        output.close = lambda: None
+
+        with Relationalize(
+            "test_case_16", lambda _: output, serializer=STDLIB_SERIALIZER
+        ) as r:
+            r._write_to_output("test_case_16", r._relationalize(CASE_1))
+            self.assertEqual(0, output.write_count)
+        self.assertEqual(1, output.write_count)
+        self.assertEqual(f"{json.dumps(CASE_1)}\n", output.getvalue())
+
+    def test_io_workers(self):
+        with Relationalize("test_case_17", create_local_buffer()) as r:
+            r.relationalize(json.loads(json.dumps(case)) for case in ALL_CASES * 50)
+            expected = read_outputs(r)
+
+        with Relationalize(
+            "test_case_17",
+            create_local_buffer(),
+            batch_size=7,
+            io_workers=3,
+            io_queue_size=1,
+        ) as r:
+            r.relationalize(json.loads(json.dumps(case)) for case in ALL_CASES * 50)
+            self.assertDictEqual(expected, read_outputs(r))
+
+    def test_io_workers_error(self):
+        r = Relationalize("test_case_18", lambda _: FailingBuffer(), io_workers=2)
+        with self.assertRaises(OSError):
+            r.relationalize([CASE_1])
+        with self.assertRaises(OSError):
+            r.close_io()
+        self.assertTrue(r.outputs["test_case_18"].closed)
+
+    def test_max_open_outputs(self):
+        with Relationalize("test_case_19", create_local_buffer()) as r:
+            r.relationalize(json.loads(json.dumps(case)) for case in ALL_CASES * 5)
+            expected = read_outputs(r)
+
+        for io_workers in (0, 2):
+            parts: dict[str, list[str]] = {}
+            opened: list[str] = []
+
+            def open_part(identifier: str):
+                opened.append(identifier)
+                return PartBuffer(parts.setdefault(identifier, []))
+
+            with Relationalize(
+                "test_case_19",
+                open_part,
+                batch_size=2,
+                io_workers=io_workers,
+                max_open_outputs=2,
+                reopen_output=open_part,
+            ) as r:
+                r.relationalize(json.loads(json.dumps(case)) for case in ALL_CASES * 5)
+                self.assertLessEqual(len(r.outputs), 2)
+            self.assertGreater(len(opened), len(expected))
+            self.assertDictEqual(
+                expected,
+                {
+                    identifier: RID_PATTERN.sub("RID", "".join(output_parts))
+                    for identifier, output_parts in parts.items()
+                },
+            )
+
+    def test_max_open_outputs_requires_reopen_output(self):
+        with self.assertRaises(ValueError):
+            Relationalize("test_case_19", create_local_buffer(), max_open_outputs=2)
+
+    def test_infer_schemas(self):
+        cases = ALL_CASES + [{"1": None, "2": [1, "a", None]}, {"1": 2, "2": [1.5]}]
+        schemas: dict[str, Schema] = {}
+
+        def on_object_write(identifier: str, object: dict[str, object]):
+            if identifier not in schemas:
+                schemas[identifier] = Schema()
+            schemas[identifier].read_object(object)
+
+        with Relationalize("test_case_20", create_local_buffer(), on_object_write) as r:
+            r.relationalize(json.loads(json.dumps(case)) for case in cases)
+
+        for plan_cache_size in (0, 4):
+            with Relationalize(
+                "test_case_20",
+                create_local_buffer(),
+                plan_cache_size=plan_cache_size,
+                infer_schemas=True,
+            ) as r:
+                r.relationalize(json.loads(json.dumps(case)) for case in cases)
+                self.assertEqual(schemas.keys(), r.schemas.keys())
+                for identifier, schema in schemas.items():
+                    self.assertEqual(
+                        list(schema.schema.items()),
+                        list(r.schemas[identifier].schema.items()),
+                    )
+        self.assertEqual("c-float-int-str", schemas["test_case_20_2"].schema["2__val_"])
+
+        with Relationalize("test_case_20", create_local_buffer()) as r:
+            r.relationalize([CASE_1])
+            self.assertDictEqual({}, r.schemas)
+
+        # Empty arrays and empty input write no rows, so they have no schema.
+        for plan_cache_size in (0, 4):
+            with Relationalize(
+                "test_case_20",
+                create_local_buffer(),
+                plan_cache_size=plan_cache_size,
+                infer_schemas=True,
+            ) as r:
+                r.relationalize([])
+                self.assertDictEqual({}, r.schemas)
+                r.relationalize([{"1": 1, "2": []}])
+                self.assertEqual(r.outputs.keys(), r.schemas.keys())
+                self.assertDictEqual(
+                    {"1": "int", "2": "str"}, r.schemas["test_case_20"].schema
+                )
+
+    def test_warm_start_schemas(self):
+        cases = ALL_CASES + [{"1": None, "2": [1, "a", None]}, {"1": 2, "2": [1.5]}]
+        with Relationalize(
+            "test_case_22", create_local_buffer(), infer_schemas=True
+        ) as r:
+            r.relationalize(json.loads(json.dumps(case)) for case in cases)
+            expected = {
+                identifier: schema.schema for identifier, schema in r.schemas.items()
+            }
+            # Without a previous run every column is new.
+            self.assertEqual(
+                {
+                    identifier: {
+                        key: (None, value_type) for key, value_type in schema.items()
+                    }
+                    for identifier, schema in expected.items()
+                },
+                r.schema_delta(),
+            )
+
+        # A previous run covering every row reports no changes.
+        previous = {
+            identifier: Schema.deserialize(Schema(schema).serialize())
+            for identifier, schema in expected.items()
+        }
+        for plan_cache_size in (0, 4):
+            with Relationalize(
+                "test_case_22",
+                create_local_buffer(),
+                plan_cache_size=plan_cache_size,
+                schemas=previous,
+            ) as r:
+                r.relationalize(json.loads(json.dumps(case)) for case in cases)
+                self.assertDictEqual({}, r.schema_delta())
+                self.assertEqual(
+                    expected,
+                    {
+                        identifier: schema.schema
+                        for identifier, schema in r.schemas.items()
+                    },
+                )
+
+        # A previous run which saw fewer rows is widened and the changes reported.
+        seed = {"1": "int", "2": "str", "3": "str"}
+        with Relationalize(
+            "test_case_22", create_local_buffer(), schemas={"test_case_22": seed}
+        ) as r:
+            r.relationalize([CASE_1, CASE_3])
+            self.assertDictEqual(
+                {
+                    "test_case_22": {
+                        "1": ("int", "c-int-str"),
+                        "3": ("str", "c-bool-str"),
+                        "4": (None, "float"),
+                    },
+                    "test_case_22_1": {
+                        "1__rid_": (None, "str"),
+                        "1__index_": (None, "int"),
+                        "1__val_": (None, "int"),
+                    },
+                },
+                r.schema_delta(),
+            )
+        self.assertDictEqual({"1": "int", "2": "str", "3": "str"}, seed)
+
+    def test_iter_rows(self):
+        with Relationalize(
+            "test_case_21",
+            create_local_buffer(),
+            rid_generator=sequential_rids("test"),
+        ) as r:
+            r.relationalize(json.loads(json.dumps(case)) for case in ALL_CASES)
+            expected = {
+                identifier: [
+                    json.loads(line) for line in output.getvalue().splitlines()
+                ]
+                for identifier, output in r.outputs.items()
+            }
+
+        written: list[str] = []
+        r = Relationalize(
+            "test_case_21",
+            lambda _: self.fail("iter_rows must not create outputs"),
+            lambda identifier, _: written.append(identifier),
+            rid_generator=sequential_rids("test"),
+            infer_schemas=True,
+        )
+        rows: dict[str, list[dict[str, object]]] = {}
+        identifiers: list[str] = []
+        for identifier, row in r.iter_rows(
+            json.loads(json.dumps(case)) for case in ALL_CASES
+        ):
+            identifiers.append(identifier)
+            rows.setdefault(identifier, []).append(row)
+        self.assertDictEqual(expected, rows)
+        self.assertEqual(identifiers, written)
+        self.assertEqual(expected.keys(), r.schemas.keys())
+        self.assertDictEqual({}, r.outputs)
+        # Sub-table rows are yielded ahead of the row referencing them.
+        self.assertEqual(
+            ["test_case_21_1", "test_case_21_1", "test_case_21"], identifiers[2:5]
+        )
+
+    def test_iter_rows_is_lazy(self):
+        r = Relationalize("test_case_21", create_local_buffer())
+        rows = list(islice(r.iter_rows(repeat(CASE_1)), 3))
+        self.assertEqual([("test_case_21", CASE_1)] * 3, rows)
+
+    def test_iter_rows_interleaved(self):
+        r = Relationalize(
+            "test_case_21",
+            create_local_buffer(),
+            rid_generator=sequential_rids("test"),
+            serializer=STDLIB_SERIALIZER,
+        )
+        first = r.iter_rows([{"1": 1, "2": [1]}, {"1": 2}])
+        second = r.iter_rows([{"1": 3}])
+        self.assertEqual(
+            ("test_case_21_2", {"2__val_": 1, "2__rid_": "R_test_0", "2__index_": 0}),
+            next(first),
+        )
+        r.relationalize([{"1": 4}])
+        self.assertEqual([("test_case_21", {"1": 3})], list(second))
+        self.assertEqual(
+            [
+                ("test_case_21", {"1": 1, "2": "R_test_0"}),
+                ("test_case_21", {"1": 2}),
+            ],
+            list(first),
+        )
+        r.flush()
+        self.assertEqual(["test_case_21"], list(r.outputs))
+        self.assertEqual('{"1": 4}\n', r.outputs["test_case_21"].getvalue())
+
 
 if __name__ == "__main__":
     unittest.main()
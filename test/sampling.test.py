@@ -0,0 +1,45 @@
+import unittest
+
+from setup_tests import setup_tests
+
+setup_tests()
+
+from relationalize.sampling import every_kth_row, first_rows, reservoir_rows
+
+ROWS = [{"1": index} for index in range(100)]
+
+
+class SamplingTest(unittest.TestCase):
+    def test_first_rows(self):
+        rows = iter(ROWS)
+        self.assertEqual(ROWS[:10], list(first_rows(10)(rows)))
+        # The remaining rows are not consumed.
+        self.assertEqual(ROWS[10], next(rows))
+        self.assertEqual(ROWS, list(first_rows(1000)(ROWS)))
+        with self.assertRaises(ValueError):
+            first_rows(0)
+
+    def test_every_kth_row(self):
+        self.assertEqual(ROWS[::10], list(every_kth_row(10)(ROWS)))
+        self.assertEqual(ROWS[3::10], list(every_kth_row(10, offset=3)(ROWS)))
+        with self.assertRaises(ValueError):
+            every_kth_row(0)
+
+    def test_reservoir_rows(self):
+        sample = reservoir_rows(10, seed=1)(iter(ROWS))
+        self.assertEqual(10, len(sample))
+        self.assertEqual(10, len({row["1"] for row in sample}))
+        self.assertTrue(all(row in ROWS for row in sample))
+        self.assertEqual(sample, reservoir_rows(10, seed=1)(ROWS))
+        self.assertEqual(ROWS[:5], reservoir_rows(10)(ROWS[:5]))
+
+        # Every row is about as likely to be sampled.
+        counts = [0] * len(ROWS)
+        for seed in range(1000):
+            for row in reservoir_rows(10, seed=seed)(ROWS):
+                counts[row["1"]] += 1
+        self.assertLess(max(counts) - min(counts), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
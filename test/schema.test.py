@@ -1,11 +1,19 @@
+import csv
+import json
+import os
+import random
+import tempfile
 import unittest
 from copy import deepcopy
+from enum import IntEnum
+from io import StringIO
 
 from setup_tests import setup_tests
 
 setup_tests()
 
-from relationalize.schema import Schema
+from relationalize.sampling import every_kth_row, first_rows
+from relationalize.schema import Schema, SchemaMismatchError
 
 CASE_1 = {"1": 1, "2": "foobar", "3": False, "4": 1.2}
 
@@ -15,6 +23,30 @@ CASE_3 = {"1": None}
 CASE_4 = {"1": 1}
 CASE_5 = {"1": "foobar"}
 
+CASE_6 = {"1": 2, "2": None, "3": True, "4": "foobar", "5": 1.5}
+
+
+class Level(IntEnum):
+    LOW = 1
+
+
+class DType:
+    def __init__(self, kind: str):
+        self.kind = kind
+
+
+class TypedArray(list):
+    """
+    A list with a NumPy style `dtype`.
+    """
+
+    def __init__(self, values: list[object], kind: str):
+        super().__init__(values)
+        self.dtype = DType(kind)
+
+
+CASE_1_SCHEMA = {"1": "int", "2": "str", "3": "bool", "4": "float"}
+
 CASE_1_DDL = """
 CREATE TABLE "public"."test" (
     "1" BIGINT
@@ -237,6 +269,516 @@ class SchemaTest(unittest.TestCase):
             {"abc": "int", "def": "int", "GH I ": "int", "abC ": "int", "D E F": "int"},
         )
 
+    def test_compile_converter(self):
+        schema1 = Schema()
+        for case in (CASE_1, CASE_2, CASE_3, CASE_6):
+            schema1.read_object(case)
+        records = [
+            CASE_1,
+            CASE_2,
+            CASE_3,
+            CASE_6,
+            {"1": Level.LOW, "6": 1, "7": None},
+            {"6": 1, "4": 1.5, "2": "foobar", "1": 2, "3": None, "5": 1.2},
+            {},
+        ]
+        converter = schema1.compile_converter()
+        for record in records:
+            if len(schema1.schema) > len(record):
+                expected = schema1._convert_object_object_iteration(record)
+            else:
+                expected = schema1._convert_object_schema_iteration(record)
+            # Same output, in the same key order.
+            self.assertEqual(list(expected.items()), list(converter(record).items()))
+
+        with self.assertRaises(Exception):
+            converter({"1": 1.5})
+        with self.assertRaises(Exception):
+            converter({"1": [1]})
+
+    def test_compile_converter_invalidation(self):
+        schema1 = Schema()
+        schema1.read_object(CASE_1)
+        converter = schema1.compile_converter()
+        self.assertIs(converter, schema1.compile_converter())
+
+        schema1.read_object(CASE_3)
+        self.assertIs(converter, schema1.compile_converter())
+
+        schema1.read_object(CASE_2)
+        self.assertIsNot(converter, schema1.compile_converter())
+        self.assertDictEqual(
+            {"1_str": "foobar", "2_float": 9.9, "3": True, "4": 9.5},
+            schema1.convert_object(CASE_2),
+        )
+
+        schema1.drop_special_char_columns(allowed_chars=set())
+        converter = schema1.compile_converter()
+        schema1.schema = {"1": "int"}
+        self.assertIsNot(converter, schema1.compile_converter())
+        self.assertDictEqual({"1": "foobar"}, schema1.convert_object(CASE_2))
+
+        # Changes made to the schema dict in place are picked up as well.
+        schema1.schema["1"] = "c-int-str"
+        self.assertDictEqual(
+            {"1_str": "foobar"}, schema1.convert_object({"1": "foobar"})
+        )
+        del schema1.schema["1"]
+        self.assertDictEqual({}, schema1.convert_object({"1": "foobar"}))
+        schema1.schema.update({"1": "c-float-str"})
+        self.assertDictEqual({"1_float": 1.5}, schema1.convert_object({"1": 1.5}))
+
+    def test_convert_stream(self):
+        schema1 = Schema()
+        for case in (CASE_1, CASE_2, CASE_3):
+            schema1.read_object(case)
+        lines = [json.dumps(case) for case in (CASE_1, CASE_2, CASE_3)] * 5 + [""]
+
+        output = StringIO()
+        self.assertEqual(15, schema1.convert_stream(lines, output, batch_size=4))
+        self.assertEqual(
+            [schema1.convert_object(case) for case in (CASE_1, CASE_2, CASE_3)] * 5,
+            [json.loads(line) for line in output.getvalue().splitlines()],
+        )
+
+        output = StringIO()
+        self.assertEqual(
+            15, schema1.convert_stream(lines, output, format="csv", batch_size=4)
+        )
+        output.seek(0)
+        rows = list(csv.DictReader(output))
+        self.assertEqual(schema1.generate_output_columns(), list(rows[0]))
+        self.assertEqual(
+            {"1_int": "1", "1_str": "", "2_float": "", "2_str": "foobar"},
+            {key: rows[0][key] for key in ("1_int", "1_str", "2_float", "2_str")},
+        )
+
+        with self.assertRaises(ValueError):
+            schema1.convert_stream(lines, StringIO(), format="xml")
+
+    def test_convert_file(self):
+        schema1 = Schema()
+        schema1.read_object(CASE_1)
+        schema1.read_object(CASE_2)
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "input.json")
+            with open(input_path, "w") as input_file:
+                for index in range(100):
+                    input_file.write(f"{json.dumps(CASE_1 if index % 3 else CASE_2)}\n")
+
+            for format in ("json", "csv"):
+                outputs: list[str] = []
+                for workers in (1, 3):
+                    output_path = os.path.join(directory, f"output_{workers}.{format}")
+                    self.assertEqual(
+                        100,
+                        schema1.convert_file(
+                            input_path, output_path, format=format, workers=workers
+                        ),
+                    )
+                    with open(output_path) as output:
+                        outputs.append(output.read())
+                self.assertEqual(outputs[0], outputs[1])
+            # The parts are removed once concatenated.
+            self.assertEqual(
+                [
+                    "input.json",
+                    "output_1.csv",
+                    "output_1.json",
+                    "output_3.csv",
+                    "output_3.json",
+                ],
+                sorted(os.listdir(directory)),
+            )
+
+            empty_path = os.path.join(directory, "empty.json")
+            open(empty_path, "w").close()
+            output_path = os.path.join(directory, "empty.csv")
+            self.assertEqual(
+                0, schema1.convert_file(empty_path, output_path, "csv", workers=3)
+            )
+            with open(output_path) as output:
+                self.assertEqual(1, len(output.readlines()))
+
+    def test_type_masks_match_type_names(self):
+        generator = random.Random(0)
+        values = [None, True, 1, Level.LOW, 1.5, "foobar", [1], {"1": 1}]
+        for _ in range(200):
+            schema1 = Schema()
+            reference = Schema()
+            for _ in range(generator.randint(1, 8)):
+                value = generator.choice(values)
+                schema1._read_write_object_key("1", value)
+                reference._read_write_type_name("1", Schema._parse_type(value))
+                self.assertDictEqual(reference.schema, schema1.schema)
+
+        schemas = [
+            {"1": value_type}
+            for value_type in (
+                "none",
+                "int",
+                "str",
+                "c-int-str",
+                "c-bool-float",
+                "c-int-none",
+                "unsupported:<class 'list'>",
+            )
+        ]
+        for first in schemas:
+            for second in schemas:
+                expected = first["1"]
+                if first["1"] != second["1"]:
+                    expected = Schema._merge_type_names(first["1"], second["1"])
+                self.assertDictEqual(
+                    {"1": expected}, Schema.merge(first, second).schema
+                )
+
+    def test_type_masks_follow_schema(self):
+        schema1 = Schema.deserialize(json.dumps({"1": "c-int-str", "2": "none"}))
+        schema1.read_object({"1": 1.5, "2": True})
+        self.assertDictEqual({"1": "c-float-int-str", "2": "bool"}, schema1.schema)
+
+        schema1.schema = {"1": "int"}
+        schema1.read_object({"1": "foobar"})
+        self.assertDictEqual({"1": "c-int-str"}, schema1.schema)
+
+        schema1.read_object({"2": None})
+        schema1.drop_null_columns()
+        schema1.read_object({"2": 1})
+        self.assertDictEqual({"1": "c-int-str", "2": "int"}, schema1.schema)
+
+    def test_shape_memo(self):
+        schema1 = Schema(shape_memo_size=2)
+        reads: list[str] = []
+        read_write_object_key = schema1._read_write_object_key
+
+        def counting_read_write_object_key(key: str, value: object):
+            reads.append(key)
+            read_write_object_key(key, value)
+
+        schema1._read_write_object_key = counting_read_write_object_key
+        for _ in range(3):
+            schema1.read_object(CASE_1)
+        self.assertEqual(4, len(reads))
+        # Same keys, different types.
+        schema1.read_object(CASE_2)
+        self.assertEqual(8, len(reads))
+        self.assertDictEqual(
+            {"1": "c-int-str", "2": "c-float-str", "3": "bool", "4": "float"},
+            schema1.schema,
+        )
+        # The memo is bounded, and starts over once full.
+        schema1.read_object(CASE_3)
+        self.assertEqual(1, len(schema1._merged_shapes))
+        schema1.read_object(CASE_1)
+        self.assertEqual(13, len(reads))
+
+        # Changing the schema otherwise, EX: dropping columns, forgets the merged shapes.
+        schema3 = Schema()
+        schema3.read_object({"a": 1, "b": None})
+        self.assertEqual(1, schema3.drop_null_columns())
+        schema3.read_object({"a": 1, "b": None})
+        self.assertDictEqual({"a": "int", "b": "none"}, schema3.schema)
+        del schema3.schema["a"]
+        schema3.read_object({"a": 1, "b": None})
+        self.assertDictEqual({"b": "none", "a": "int"}, schema3.schema)
+        schema3.schema["a"] = "str"
+        schema3.read_object({"a": 1, "b": None})
+        self.assertEqual("c-int-str", schema3.schema["a"])
+
+        schema2 = Schema(shape_memo_size=0)
+        for _ in range(3):
+            schema2.read_object(CASE_1)
+        self.assertEqual(0, len(schema2._merged_shapes))
+        self.assertDictEqual(
+            {"1": "int", "2": "str", "3": "bool", "4": "float"}, schema2.schema
+        )
+
+    def test_read_batch(self):
+        generator = random.Random(0)
+        values = [None, True, 1, Level.LOW, 1.5, "foobar", [1]]
+        rows = [
+            {
+                key: generator.choice(values)
+                for key in generator.sample(["1", "2", "3", "4", "5"], 3)
+            }
+            for _ in range(200)
+        ]
+        expected = Schema()
+        for row in rows:
+            expected.read_object(row)
+        schema1 = Schema()
+        for start in range(0, len(rows), 50):
+            schema1.read_batch(rows[start : start + 50])
+        self.assertEqual(list(expected.schema.items()), list(schema1.schema.items()))
+
+    def test_read_columns(self):
+        schema1 = Schema()
+        schema1.read_columns(
+            {
+                "1": [1, None, "foobar"],
+                "2": iter([None, None]),
+                "3": TypedArray([1, 2], "i"),
+                "4": TypedArray([0.5], "f"),
+                "5": TypedArray([], "b"),
+                "6": TypedArray([1, "foobar"], "O"),
+            }
+        )
+        self.assertDictEqual(
+            {"1": "c-int-str", "2": "none", "3": "int", "4": "float", "6": "c-int-str"},
+            schema1.schema,
+        )
+        schema1.read_columns({"2": [True], "3": TypedArray(["foobar"], "U")})
+        self.assertDictEqual(
+            {
+                "1": "c-int-str",
+                "2": "bool",
+                "3": "c-int-str",
+                "4": "float",
+                "6": "c-int-str",
+            },
+            schema1.schema,
+        )
+
+    def test_merge_in(self):
+        schema1 = Schema()
+        schema1.read_object(CASE_1)
+        schema2 = Schema()
+        schema2.read_object(CASE_2)
+        schema2.read_object(CASE_3)
+
+        self.assertIs(schema1, schema1.merge_in(schema2).merge_in({"5": "none"}))
+        self.assertDictEqual(
+            {
+                "1": "c-int-str",
+                "2": "c-float-str",
+                "3": "bool",
+                "4": "float",
+                "5": "none",
+            },
+            schema1.schema,
+        )
+        self.assertDictEqual(
+            Schema.merge(CASE_1_SCHEMA, schema2.schema, {"5": "none"}).schema,
+            schema1.schema,
+        )
+        self.assertDictEqual({"1_int": 1}, schema1.convert_object({"1": 1}))
+
+    def test_in_place_changes(self):
+        schema1 = Schema(shape_memo_size=0)
+        schema1.read_object({"a": 1})
+        del schema1.schema["a"]
+        schema1.read_object({"a": 1})
+        self.assertDictEqual({"a": "int"}, schema1.schema)
+        schema1.schema["a"] = "str"
+        self.assertFalse(schema1.fits_object({"a": 1}))
+        schema1.read_object({"a": 1})
+        self.assertDictEqual({"a": "c-int-str"}, schema1.schema)
+        schema1.schema.pop("a")
+        self.assertEqual(b"", schema1.to_bytes())
+        self.assertDictEqual({"a": "int"}, schema1.merge_in({"a": "int"}).schema)
+
+    def test_to_bytes(self):
+        schema1 = Schema(
+            {
+                "1": "int",
+                "2": "c-int-str",
+                "3": "none",
+                "4": "c-str-int",
+                "5": "unsupported:<class 'list'>",
+                "é" * 100: "c-bool-datetime-float-int-str",
+            }
+        )
+        content = schema1.to_bytes()
+        self.assertLess(len(content), len(schema1.serialize().encode()))
+        self.assertEqual(
+            list(schema1.schema.items()),
+            list(Schema.from_bytes(content).schema.items()),
+        )
+        self.assertDictEqual({}, Schema.from_bytes(Schema().to_bytes()).schema)
+
+    def test_read_sample(self):
+        rows = [CASE_1] * 10 + [CASE_2]
+        schema1 = Schema()
+        self.assertEqual(10, schema1.read_sample(iter(rows), first_rows(10)))
+        self.assertDictEqual(CASE_1_SCHEMA, schema1.schema)
+        schema2 = Schema()
+        self.assertEqual(2, schema2.read_sample(rows, every_kth_row(10)))
+        self.assertDictEqual(
+            {"1": "c-int-str", "2": "c-float-str", "3": "bool", "4": "float"},
+            schema2.schema,
+        )
+
+    def test_fits_object(self):
+        schema1 = Schema()
+        schema1.read_object(CASE_1)
+        schema1.read_object({"5": [1]})
+        self.assertTrue(schema1.fits_object(CASE_1))
+        self.assertTrue(schema1.fits_object({"1": None, "5": [2]}))
+        self.assertTrue(schema1.fits_object({}))
+        self.assertFalse(schema1.fits_object(CASE_2))
+        self.assertFalse(schema1.fits_object({"6": 1}))
+        self.assertFalse(schema1.fits_object({"5": 1}))
+        self.assertFalse(schema1.fits_object({"1": [1]}))
+        schema1.read_object(CASE_2)
+        self.assertTrue(schema1.fits_object(CASE_2))
+
+    def test_convert_stream_on_mismatch(self):
+        lines = [json.dumps(case) for case in (CASE_1, CASE_2, CASE_1, {"5": 1})]
+        schema1 = Schema()
+        schema1.read_object(CASE_1)
+
+        with self.assertRaises(SchemaMismatchError):
+            schema1.convert_stream(lines, StringIO(), on_mismatch="raise")
+
+        output = StringIO()
+        rejects = StringIO()
+        self.assertEqual(
+            2,
+            schema1.convert_stream(
+                lines, output, on_mismatch="reject", rejects=rejects
+            ),
+        )
+        self.assertEqual(
+            [CASE_1, CASE_1],
+            [json.loads(line) for line in output.getvalue().splitlines()],
+        )
+        self.assertEqual(f"{lines[1]}\n{lines[3]}\n", rejects.getvalue())
+        self.assertDictEqual(CASE_1_SCHEMA, schema1.schema)
+
+        # Turning columns 1 and 2 into choice columns would rename the columns of the first row.
+        with self.assertRaises(SchemaMismatchError):
+            schema1.convert_stream(lines, StringIO(), on_mismatch="widen")
+        self.assertDictEqual(CASE_1_SCHEMA, schema1.schema)
+
+        output = StringIO()
+        rejects = StringIO()
+        widen_lines = [*lines, json.dumps({"6": None}), json.dumps({"6": "foobar"})]
+        self.assertEqual(
+            5,
+            schema1.convert_stream(
+                widen_lines, output, on_mismatch="widen", rejects=rejects
+            ),
+        )
+        converted_rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(
+            [CASE_1, CASE_1, {"5": 1}, {"6": None}, {"6": "foobar"}], converted_rows
+        )
+        self.assertEqual(f"{lines[1]}\n", rejects.getvalue())
+        self.assertEqual("int", schema1.schema["5"])
+        self.assertEqual("str", schema1.schema["6"])
+        output_columns = set(schema1.generate_output_columns())
+        self.assertTrue(all(set(row) <= output_columns for row in converted_rows))
+
+        for on_mismatch, format in (
+            ("unknown", "json"),
+            ("reject", "json"),
+            ("widen", "csv"),
+        ):
+            with self.assertRaises(ValueError):
+                schema1.convert_stream(
+                    lines, StringIO(), format=format, on_mismatch=on_mismatch
+                )
+
+    def test_convert_file_rejects(self):
+        schema1 = Schema()
+        schema1.read_object(CASE_1)
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "input.json")
+            with open(input_path, "w") as input_file:
+                for index in range(100):
+                    input_file.write(f"{json.dumps(CASE_1 if index % 3 else CASE_2)}\n")
+
+            for workers in (1, 3):
+                output_path = os.path.join(directory, "output.json")
+                rejects_path = os.path.join(directory, "rejects.json")
+                self.assertEqual(
+                    66,
+                    schema1.convert_file(
+                        input_path,
+                        output_path,
+                        workers=workers,
+                        on_mismatch="reject",
+                        rejects_path=rejects_path,
+                    ),
+                )
+                with open(rejects_path) as rejects:
+                    self.assertEqual(
+                        [CASE_2] * 34, [json.loads(line) for line in rejects]
+                    )
+                self.assertEqual(
+                    ["input.json", "output.json", "rejects.json"],
+                    sorted(os.listdir(directory)),
+                )
+                with self.assertRaises(SchemaMismatchError):
+                    schema1.convert_file(
+                        input_path, output_path, workers=workers, on_mismatch="raise"
+                    )
+            with self.assertRaises(ValueError):
+                schema1.convert_file(input_path, output_path, on_mismatch="widen")
+
+    def test_delta(self):
+        schema1 = Schema.deserialize(json.dumps(CASE_1_SCHEMA))
+        self.assertDictEqual({}, schema1.delta(CASE_1_SCHEMA))
+        schema1.read_object(CASE_2)
+        schema1.read_object({"5": None})
+        schema1.drop_null_columns()
+        del schema1.schema["4"]
+        self.assertDictEqual(
+            {
+                "1": ("int", "c-int-str"),
+                "2": ("str", "c-float-str"),
+                "4": ("float", None),
+            },
+            schema1.delta(Schema(CASE_1_SCHEMA)),
+        )
+
+    def test_generate_alter_ddl(self):
+        schema1 = Schema()
+        schema1.read_object(CASE_1)
+        schema1.read_object({"5": None, "6": 1, 'quote"d': 1})
+        schema2 = Schema.merge(schema1)
+        self.assertEqual([], schema2.generate_alter_ddl(schema1, "test"))
+
+        schema2.read_object(CASE_2)
+        schema2.read_object({"5": 1, "6": 1.5, "7": "foobar", 'quote"d': "foobar"})
+        self.assertEqual(
+            [
+                'ALTER TABLE "public"."test" ADD COLUMN "1_int" BIGINT;',
+                'ALTER TABLE "public"."test" ADD COLUMN "1_str" VARCHAR(65535);',
+                'ALTER TABLE "public"."test" ADD COLUMN "2_float" FLOAT;',
+                'ALTER TABLE "public"."test" ADD COLUMN "2_str" VARCHAR(65535);',
+                'ALTER TABLE "public"."test" ADD COLUMN "6_float" FLOAT;',
+                'ALTER TABLE "public"."test" ADD COLUMN "6_int" BIGINT;',
+                'ALTER TABLE "public"."test" ADD COLUMN "7" VARCHAR(65535);',
+                'ALTER TABLE "public"."test" ADD COLUMN "quote""d_int" BIGINT;',
+                'ALTER TABLE "public"."test" ADD COLUMN "quote""d_str" VARCHAR(65535);',
+                'ALTER TABLE "public"."test" ALTER COLUMN "5" TYPE BIGINT USING NULL;',
+            ],
+            schema2.generate_alter_ddl(schema1.schema, "test"),
+        )
+
+        # A conflicting type, EX: from a schema inferred from scratch, adds a choice instead of retyping.
+        self.assertEqual(
+            [
+                'ALTER TABLE "public"."test" ADD COLUMN "x_int" BIGINT;',
+                'ALTER TABLE "public"."test" ADD COLUMN "x_str" VARCHAR(65535);',
+            ],
+            Schema({"x": "str"}).generate_alter_ddl(Schema({"x": "int"}), "test"),
+        )
+        self.assertEqual(
+            [],
+            Schema({"x": "int"}).generate_alter_ddl(Schema({"x": "c-int-str"}), "test"),
+        )
+
+        # Widening a choice column only adds its new sub-column.
+        schema3 = Schema.merge(schema2)
+        schema3.read_object({"1": 1.5})
+        self.assertEqual(
+            ['ALTER TABLE "analytics"."test" ADD COLUMN "1_float" FLOAT;'],
+            schema3.generate_alter_ddl(schema2, "test", schema="analytics"),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
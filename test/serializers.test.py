@@ -0,0 +1,102 @@
+from datetime import datetime
+import json
+import math
+import unittest
+
+from setup_tests import setup_tests
+
+setup_tests()
+
+from relationalize import Relationalize
+from relationalize.serializers import (
+    MsgspecSerializer,
+    OrjsonSerializer,
+    StdlibSerializer,
+    get_serializer,
+    msgspec,
+    orjson,
+)
+from relationalize.utils import create_local_buffer
+
+CASE_1 = {"1": 1, "2": "foobar", "3": False, "4": 1.2, "5": None}
+
+CASE_2 = {"1": float("nan"), "2": [float("inf"), {"3": float("-inf")}], "4": 1.5}
+
+# Ordered from the least to the most preferred backend.
+AVAILABLE_SERIALIZERS = [StdlibSerializer]
+if msgspec is not None:
+    AVAILABLE_SERIALIZERS.append(MsgspecSerializer)
+if orjson is not None:
+    AVAILABLE_SERIALIZERS.append(OrjsonSerializer)
+
+
+class SerializersTest(unittest.TestCase):
+    def test_round_trip(self):
+        for serializer_class in AVAILABLE_SERIALIZERS:
+            serializer = serializer_class()
+            self.assertDictEqual(CASE_1, serializer.loads(serializer.dumps(CASE_1)))
+
+    def test_ignore_nan(self):
+        for serializer_class in AVAILABLE_SERIALIZERS:
+            serializer = serializer_class(ignore_nan=True)
+            self.assertDictEqual(
+                {"1": None, "2": [None, {"3": None}], "4": 1.5},
+                serializer.loads(serializer.dumps(CASE_2)),
+            )
+
+    def test_stdlib_nan_literal(self):
+        self.assertEqual('{"1": NaN}', StdlibSerializer().dumps({"1": float("nan")}))
+
+    def test_get_serializer(self):
+        self.assertIsInstance(get_serializer("json"), StdlibSerializer)
+        self.assertTrue(get_serializer("json", ignore_nan=True).ignore_nan)
+        self.assertIsInstance(get_serializer(), AVAILABLE_SERIALIZERS[-1])
+        with self.assertRaises(ValueError):
+            get_serializer("foobar")
+
+    def test_default_big_integers(self):
+        serializer = get_serializer()
+        content = {"1": 10**30, "2": [-(10**30), 1]}
+        self.assertEqual(content, json.loads(serializer.dumps(content)))
+        self.assertDictEqual(content, serializer.loads(serializer.dumps(content)))
+        self.assertEqual(
+            10**30, serializer.loads(b'{"1": 1000000000000000000000000000000}')["1"]
+        )
+
+        with Relationalize("test_case_1", create_local_buffer()) as r:
+            r.relationalize([{"1": 10**30}])
+            self.assertDictEqual(
+                {"1": 10**30}, serializer.loads(r.outputs["test_case_1"].getvalue())
+            )
+
+    def test_default_nan_input(self):
+        content = get_serializer().loads('{"1": NaN, "2": [Infinity, 1.5]}')
+        self.assertTrue(math.isnan(content["1"]))
+        self.assertEqual([float("inf"), 1.5], content["2"])
+
+    def test_default_nan_output(self):
+        self.assertEqual(json.dumps(CASE_2), get_serializer().dumps(CASE_2))
+        self.assertEqual(
+            StdlibSerializer(ignore_nan=True).dumps(CASE_2),
+            json.dumps(json.loads(get_serializer(ignore_nan=True).dumps(CASE_2))),
+        )
+        self.assertEqual(
+            json.dumps(CASE_1), json.dumps(json.loads(get_serializer().dumps(CASE_1)))
+        )
+
+    def test_default_rejects_like_json(self):
+        for content in ({"1": datetime(2023, 1, 1)}, {"1": {1, 2}}):
+            with self.assertRaises(TypeError):
+                json.dumps(content)
+            with self.assertRaises(TypeError):
+                get_serializer().dumps(content)
+        self.assertEqual('{"1": 2}', get_serializer().dumps({1: 2}))
+
+    @unittest.skipIf(orjson is not None, "orjson is installed")
+    def test_missing_backend(self):
+        with self.assertRaises(ImportError):
+            OrjsonSerializer()
+
+
+if __name__ == "__main__":
+    unittest.main()
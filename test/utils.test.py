@@ -0,0 +1,154 @@
+import os
+import tempfile
+import unittest
+
+from setup_tests import setup_tests
+
+setup_tests()
+
+from relationalize import Relationalize
+from relationalize.rids import sequential_rids
+from relationalize.utils import (
+    WriteBehindFile,
+    create_local_buffer,
+    create_local_file,
+    create_spilling_buffer,
+)
+
+CASE_1 = {"1": 1, "2": "foobar", "3": False, "4": 1.2}
+
+
+class FailingFile:
+    def write(self, s: str) -> int:
+        raise OSError("disk full")
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class UtilsTest(unittest.TestCase):
+    def test_local_file(self):
+        for write_behind in (False, True):
+            with tempfile.TemporaryDirectory() as output_dir:
+                create_output = create_local_file(output_dir, write_behind=write_behind)
+                with Relationalize("test_case_1", create_output) as r:
+                    r.relationalize([CASE_1] * 3)
+                    self.assertEqual(
+                        write_behind,
+                        isinstance(r.outputs["test_case_1"], WriteBehindFile),
+                    )
+
+                with open(os.path.join(output_dir, "test_case_1.json")) as output:
+                    self.assertEqual(3, len(output.readlines()))
+
+    def test_local_file_append(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            with Relationalize(
+                "test_case_1",
+                create_local_file(output_dir),
+                max_open_outputs=1,
+                reopen_output=create_local_file(output_dir, append=True),
+            ) as r:
+                r.relationalize([{"1": [1, 2], "2": [3]}] * 3)
+
+            for identifier, line_count in (
+                ("test_case_1", 3),
+                ("test_case_1_1", 6),
+                ("test_case_1_2", 3),
+            ):
+                with open(os.path.join(output_dir, f"{identifier}.json")) as output:
+                    self.assertEqual(line_count, len(output.readlines()))
+
+    def test_local_file_buffering(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            path = os.path.join(output_dir, "test_case_2.json")
+
+            buffered_file = create_local_file(output_dir)("test_case_2")
+            buffered_file.write("foobar\n")
+            self.assertEqual(0, os.path.getsize(path))
+            buffered_file.close()
+            self.assertEqual(7, os.path.getsize(path))
+
+            line_buffered_file = create_local_file(output_dir, buffer_size=1)(
+                "test_case_2"
+            )
+            line_buffered_file.write("foobar\n")
+            self.assertEqual(7, os.path.getsize(path))
+            line_buffered_file.close()
+
+    def test_write_behind_flush(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            path = os.path.join(output_dir, "test_case_3.json")
+            write_behind_file = create_local_file(output_dir, write_behind=True)(
+                "test_case_3"
+            )
+            for _ in range(100):
+                write_behind_file.write("foobar\n")
+            write_behind_file.flush()
+            self.assertEqual(700, os.path.getsize(path))
+            write_behind_file.close()
+            self.assertTrue(write_behind_file.closed)
+            with self.assertRaises(ValueError):
+                write_behind_file.write("foobar\n")
+
+    def test_write_behind_error(self):
+        write_behind_file = WriteBehindFile(FailingFile())
+        write_behind_file.write("foobar\n")
+        with self.assertRaises(OSError):
+            write_behind_file.flush()
+        with self.assertRaises(OSError):
+            write_behind_file.close()
+        self.assertTrue(write_behind_file.closed)
+
+    def test_spilling_buffer(self):
+        objects = [{"1": [CASE_1] * 3, "2": ["foobar"] * 10, "3": 1}] * 50
+        with Relationalize(
+            "test_case_4", create_local_buffer(), rid_generator=sequential_rids("test")
+        ) as r:
+            r.relationalize(objects)
+            expected = {
+                identifier: output.getvalue()
+                for identifier, output in r.outputs.items()
+            }
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            with Relationalize(
+                "test_case_4",
+                create_spilling_buffer(memory_budget=4096, spill_dir=spill_dir),
+                batch_size=10,
+                rid_generator=sequential_rids("test"),
+            ) as r:
+                r.relationalize(objects)
+                # The sub-table holding the most content is spilled first.
+                self.assertTrue(r.outputs["test_case_4_1"].spilled)
+                self.assertLessEqual(
+                    sum(output.size for output in r.outputs.values()), 4096
+                )
+                for identifier, output in r.outputs.items():
+                    self.assertEqual(expected[identifier], output.getvalue())
+                    output.seek(0)
+                    self.assertEqual(
+                        expected[identifier].splitlines(keepends=True),
+                        output.readlines(),
+                    )
+
+    def test_spilling_buffer_position(self):
+        create_output = create_spilling_buffer(memory_budget=10)
+        spilling_buffer = create_output("test_case_5")
+        spilling_buffer.write("foo\nbar\n")
+        self.assertFalse(spilling_buffer.spilled)
+        spilling_buffer.seek(0)
+        self.assertEqual("foo\n", spilling_buffer.readline())
+        # Exceeding the budget spills the buffer, reading continues where it was.
+        create_output("test_case_6").write("foobar")
+        self.assertTrue(spilling_buffer.spilled)
+        self.assertEqual("bar\n", spilling_buffer.readline())
+        spilling_buffer.close()
+        self.assertTrue(spilling_buffer.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()